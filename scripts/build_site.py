@@ -9,39 +9,197 @@ Build a static, responsive dashboard at ./site/index.html
 - Renders pass/fail & scores per metric
 - Adds copy-to-clipboard for SQL blocks
 - Link out to /colibri/ lineage site if present
+- Stages the raw reports under ./site/out (hardlink, copy as fallback)
+- Skips rendering when the reports hash the same as for the last build
+- Writes a gzip -9 copy next to the page (./site/index.html.gz)
 
 Usage:
-  uv run python scripts/build_site.py
+  uv run python scripts/build_site.py [--force]
 """
 
 from __future__ import annotations
 
-import json
+import argparse
+import gzip
+import hashlib
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Tuple
+from functools import lru_cache
+from html import escape
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Tuple
+
+from tsql_eval.jsonio import loads as _loads
 
 ROOT = Path(__file__).resolve().parents[1]
 OUT_DIR = ROOT / "out"
 SITE_DIR = ROOT / "site"
 SITE_DIR.mkdir(parents=True, exist_ok=True)
+SITE_OUT_DIR = SITE_DIR / "out"
+CACHE_DIR = SITE_DIR / ".cache"
+# "<sha256 of inputs> <mtime_ns> <size> <lineage pages>" of the last rendered index.html;
+# see _build_digest() and _lineage_state()
+PAGE_STAMP = CACHE_DIR / "index.sha256"
+# lineage pages the header can link to, in order of preference
+LINEAGE_PAGES = (SITE_DIR / "colibri" / "index.html", ROOT / "dbt" / "dist" / "index.html")
+# precompressed copy of index.html for hosts that serve .gz siblings
+PAGE_GZ = SITE_DIR / "index.html.gz"
+# reports smaller than this are parsed inline; a thread costs more than the read
+PARALLEL_MIN_BYTES = 64 * 1024
+
+_DIGITS_RE = re.compile(r"\d+")
+
+# Single-pass escaping for SQL/reason text; '"' is included because SQL also lands
+# in data-copy="..." attributes (quoted identifiers would otherwise end the attribute).
+_ESC = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+# escape() memoized for small-cardinality strings (ids, model labels, metric names);
+# free text (questions, SQL, reasons) goes through plain escape().
+_esc = lru_cache(maxsize=8192)(escape)
+
+_BADGE_TMPL = (
+    '<div class="metric %s" title="%s"><span class="metric-name">%s</span>'
+    '<span class="metric-icon">%s</span><span class="metric-score">%s</span>'
+    '<span class="metric-thr">/ %s</span><span class="metric-reason">%s</span></div>'
+)
+# ok -> (css class, icon, title)
+_BADGE_STATE = {True: ("ok", "✓", "pass"), False: ("fail", "✗", "fail"), None: ("unk", "•", "n/a")}
+
+_PASS_PILL = '<div class="pill pass">ALL PASS</div>'
+_FAIL_PILL = '<div class="pill fail">NOT PASS</div>'
+
+# Tiny JS for copy & anchor scrolling
+# hand-minified: copies the SQL of the clicked .copy button and flashes the result on it
+_JS = (
+    "<script>document.addEventListener('click',e=>{"
+    "const b=e.target.closest('.copy');if(!b)return;"
+    "const t=b.getAttribute('data-copy')||'';"
+    "const f=m=>{b.textContent=m;setTimeout(()=>b.textContent='Copy',1200)};"
+    "navigator.clipboard.writeText(t.replaceAll('&lt;','<').replaceAll('&gt;','>').replaceAll('&amp;','&'))"
+    ".then(()=>f('Copied')).catch(()=>f('Error'))});</script>\n"
+)
+
+_CSS = """
+:root { --bg:#0b0f14; --card:#111827; --muted:#9CA3AF; --fg:#E5E7EB; --pill:#374151; --ok:#10B981; --fail:#EF4444; --unk:#6B7280; --accent:#60A5FA; }
+* { box-sizing: border-box; }
+html, body { margin:0; padding:0; background:var(--bg); color:var(--fg); font: 16px/1.5 ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Noto Sans, Ubuntu; }
+a { color: var(--accent); text-decoration: none; }
+.container { max-width: 1100px; margin: 0 auto; padding: 24px 16px 80px; }
+header { display:flex; align-items:center; justify-content:space-between; gap:12px; margin-bottom: 18px; }
+header .title { font-size: 22px; font-weight: 700; letter-spacing:.2px; }
+header .links { display:flex; gap:10px; flex-wrap:wrap; }
+.btn { display:inline-flex; align-items:center; gap:8px; padding:8px 12px; border-radius:10px; background:#0f172a; border:1px solid #1f2937; color:#e5e7eb; font-size:13px; }
+.btn:hover { background:#111827; }
+.meta { color: var(--muted); font-size: 12px; margin-bottom: 18px; }
+
+.nav { display:flex; gap:8px; flex-wrap:wrap; margin: 8px 0 22px; }
+.chip { background:#0f172a; border:1px solid #1f2937; color:#cbd5e1; font-size:12px; padding:6px 10px; border-radius:999px; }
+.chip:hover { background:#111827; }
+
+section.case { background: #0c1220; border: 1px solid #1f2937; border-radius: 16px; padding:16px; margin: 14px 0 24px; }
+section .q { margin: 0 0 10px; font-size: 18px; font-weight: 700; }
+
+.gold-wrap { display:grid; grid-template-columns: 1fr; gap: 10px; margin: 10px 0 12px; }
+@media(min-width: 720px) { .gold-wrap { grid-template-columns: repeat(2, 1fr); } }
+
+.grid { display:grid; gap: 12px; grid-template-columns: 1fr; }
+@media(min-width: 820px) { .grid { grid-template-columns: repeat(3, 1fr); } }
+
+.card { background: var(--card); border:1px solid #1f2937; border-radius: 14px; padding: 12px; }
+.card-head { display:flex; align-items:center; justify-content:space-between; margin-bottom: 8px; }
+.card .model { font-weight: 700; letter-spacing: .2px; }
+.pill { font-size:11px; padding:3px 8px; border-radius: 999px; border:1px solid var(--pill); color:#e5e7eb; }
+.pill.pass { border-color: var(--ok); color: var(--ok); }
+.pill.fail { border-color: var(--fail); color: var(--fail); }
+
+.code-card { background:#0b1220; border:1px solid #1f2937; border-radius: 12px; }
+.code-card + .code-card { margin-top: 8px; }
+.code-card-head { display:flex; align-items:center; justify-content:space-between; padding:8px 10px; border-bottom:1px solid #1f2937; color:#cbd5e1; font-size:12px; }
+.copy { background:#0f172a; border:1px solid #334155; color:#cbd5e1; padding:6px 10px; border-radius: 8px; font-size:12px; cursor:pointer; }
+.copy:hover { background:#111827; }
+pre { margin:0; padding:12px; overflow:auto; font-size:13px; }
+code { font-family: ui-monospace, SFMono-Regular, Menlo, Consolas, "Liberation Mono", monospace; }
+
+.metrics { display:flex; flex-direction:column; gap:6px; margin-top:10px; }
+.metric { display:flex; align-items:center; gap:8px; font-size:12px; color:#cbd5e1; }
+.metric .metric-name { min-width: 140px; color:#e5e7eb; font-weight:600; }
+.metric .metric-icon { width:18px; text-align:center; }
+.metric.ok .metric-icon { color: var(--ok); }
+.metric.fail .metric-icon { color: var(--fail); }
+.metric.unk .metric-icon { color: var(--unk); }
+.metric .metric-score { font-variant-numeric: tabular-nums; }
+.metric .metric-thr { color: #94a3b8; font-variant-numeric: tabular-nums; }
+.metric .metric-reason { color:#9ca3af; overflow:hidden; text-overflow:ellipsis; white-space:nowrap; }
+
+.code-card .muted, .card .muted { color: var(--muted); padding: 10px; }
+footer { margin-top: 40px; color: #9CA3AF; font-size: 12px; text-align:center; }
+"""
+
+# Minified once at import: drop comments and the whitespace around punctuation.
+_CSS_MIN = re.sub(r"/\*.*?\*/", "", _CSS, flags=re.S)
+_CSS_MIN = re.sub(r"\s*([{}:;,>])\s*", r"\1", _CSS_MIN)
+_CSS_MIN = re.sub(r"\s+", " ", _CSS_MIN).strip()
+
+# Page skeleton, assembled once at import. Only _PAGE_HEADER has placeholders;
+# the CSS/JS parts are plain concatenation so their braces need no escaping.
+_PAGE_PREFIX = (
+    "<!doctype html>\n"
+    '<html lang="ko">\n'
+    '<meta charset="utf-8"/>\n'
+    '<meta name="viewport" content="width=device-width,initial-scale=1"/>\n'
+    "<title>Text2SQL — Model Comparison Dashboard</title>\n"
+    "<style>" + _CSS_MIN + "</style>\n"
+    "<body>\n"
+    '<div class="container">\n'
+)
+
+_PAGE_HEADER = (
+    '<header><div class="title">Text2SQL — Model Comparison</div><div class="links">'
+    '<a class="btn" href="https://github.com/kyungjunleeme/Text2SQL" target="_blank">GitHub</a>'
+    "{colibri_link}</div></header>\n"
+    '<div class="meta">Built at {dt}. Reports loaded: {files_list}</div>\n'
+)
+
+_PAGE_TAIL = (
+    "<footer>Generated from ./out/*.json — each case shows Gold SQL and model predictions.<br/>"
+    "Use the chips to jump between questions. Click “Copy” to copy SQL.</footer>\n"
+    "</div>\n" + _JS + "</body>\n</html>\n"
+)
 
 
 def infer_model_label(p: Path) -> str:
-    s = p.stem.lower()
-    if "llama" in s:
-        return "Llama"
-    if "chatgpt" in s or "gpt" in s:
-        return "ChatGPT"
-    if "genie" in s:
-        return "Genie"
-    if "mistral" in s:
-        return "Mistral"
-    if "nyc_duckdb" in s:
-        # generic name for single-run
-        return "Model"
+    return _label_for_stem(p.stem)
+
+
+# (needle, label) checked in order against the lowercased stem; first hit wins.
+# "nyc_duckdb" is the generic name for a single-run report.
+_LABELS = (
+    ("llama", "Llama"),
+    ("gpt", "ChatGPT"),  # also covers "chatgpt"
+    ("genie", "Genie"),
+    ("mistral", "Mistral"),
+    ("nyc_duckdb", "Model"),
+)
+
+
+@lru_cache(maxsize=256)
+def _label_for_stem(stem: str) -> str:
+    s = stem.lower()
+    for needle, label in _LABELS:
+        if needle in s:
+            return label
     # fallback: filename
-    return p.stem
+    return stem
+
+
+def _idkey(qid: str) -> Tuple[int, str]:
+    """Natural sort key: 'q2' before 'q10'; ids without digits go last."""
+    m = _DIGITS_RE.search(qid)
+    return (int(m.group()) if m else 10**9, qid)
 
 
 def ensure_list_gold(x: Any) -> List[str]:
@@ -52,7 +210,67 @@ def ensure_list_gold(x: Any) -> List[str]:
     return [str(x)] if str(x).strip() else []
 
 
-def load_reports() -> Tuple[Dict[str, Any], List[Path]]:
+def summarize_report(data: Dict[str, Any]) -> Dict[str, int]:
+    """Pass count of one report (tsql-eval 'passed_all' per result)."""
+    # tsql-eval already writes the totals; only walk results for other producers
+    pre = data.get("summary")
+    if isinstance(pre, dict) and isinstance(pre.get("passed_all"), int) and isinstance(pre.get("total"), int):
+        return {"passed": pre["passed_all"], "total": pre["total"]}
+    results = data.get("results") or ()
+    # list.count runs in C; no generator frame per row
+    passed = [r.get("passed_all") for r in results].count(True)
+    return {"passed": passed, "total": len(results)}
+
+
+def _scan_json(d: Path) -> List[os.DirEntry]:
+    """*.json entries of d sorted by name; DirEntry caches stat() for later reuse."""
+    try:
+        with os.scandir(d) as it:
+            entries = [e for e in it if e.name.endswith(".json") and e.is_file()]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=attrgetter("name"))
+    return entries
+
+
+def _stage_file(src: str, dst: Path) -> None:
+    """Hardlink src to dst (no bytes copied); copy data + stat across filesystems."""
+    tmp = dst.with_name(dst.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+        shutil.copystat(src, tmp)
+    os.replace(tmp, dst)
+
+
+def copy_reports_into_site() -> None:
+    """Stage ./out/*.json into ./site/out so the raw reports are published with the page."""
+    entries = _scan_json(OUT_DIR)
+    if entries:
+        SITE_OUT_DIR.mkdir(parents=True, exist_ok=True)
+    for e in entries:
+        dst = SITE_OUT_DIR / e.name
+        st = e.stat()
+        try:
+            dst_st = dst.stat()
+            if dst_st.st_mtime_ns == st.st_mtime_ns and dst_st.st_size == st.st_size:
+                continue
+        except FileNotFoundError:
+            pass
+        _stage_file(e.path, dst)
+
+
+def _load_one(path: str) -> Any:
+    """Read + parse one report; None if unreadable or malformed."""
+    try:
+        return _loads(Path(path).read_bytes())
+    except Exception:
+        return None
+
+
+def load_reports() -> Tuple[Dict[str, Any], List[Path], Dict[str, Dict[str, int]]]:
     """
     Returns:
       tests: {
@@ -70,52 +288,63 @@ def load_reports() -> Tuple[Dict[str, Any], List[Path]]:
         }
       }
       files: list of report paths used
+      summaries: {file name: {'passed': int, 'total': int}}
     """
     tests: Dict[str, Any] = {}
-    files: List[Path] = sorted(OUT_DIR.glob("*.json"))
-
-    for f in files:
-        try:
-            data = json.loads(f.read_text(encoding="utf-8"))
-        except Exception:
+    entries = _scan_json(OUT_DIR)
+    files: List[Path] = [Path(e.path) for e in entries]
+    summaries: Dict[str, Dict[str, int]] = {}
+
+    # overlap read/parse of large reports; order is kept by merging in `entries` order
+    big = [e.path for e in entries if e.stat().st_size >= PARALLEL_MIN_BYTES]
+    parsed: Dict[str, Any] = {}
+    if len(big) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(big), os.cpu_count() or 1)) as ex:
+            parsed = dict(zip(big, ex.map(_load_one, big)))
+
+    for e, f in zip(entries, files):
+        st = e.stat()
+        if st.st_size == 0:
+            # e.g. a report still being written; nothing to decode
+            continue
+        data = parsed[e.path] if e.path in parsed else _load_one(e.path)
+        if not isinstance(data, dict):
             continue
-        results = data.get("results") or []
+        summaries[f.name] = summarize_report(data)
+        results = data.get("results") or ()
         model = infer_model_label(f)
 
         for r in results:
             qid = r.get("id") or r.get("question") or f"{f.stem}-{len(tests)}"
-            question = r.get("question") or ""
-            gold_sqls = ensure_list_gold(r.get("gold_sql"))
-            pred_sql = r.get("pred_sql") or ""
-            metrics = r.get("metrics") or []
-            passed = bool(r.get("passed_all"))
-
-            if qid not in tests:
-                tests[qid] = {
+
+            # question/gold are only read when the case is new or still has no gold;
+            # later reports for the same case only contribute their model entry
+            case = tests.get(qid)
+            if case is None:
+                case = tests[qid] = {
                     "id": r.get("id"),
-                    "question": question,
-                    "gold_sqls": gold_sqls[:],
+                    "question": r.get("question") or "",
+                    "gold_sqls": ensure_list_gold(r.get("gold_sql")),
                     "models": {},
                 }
-            else:
+            elif not case["gold_sqls"]:
                 # merge golds if missing on earlier file
-                if not tests[qid]["gold_sqls"] and gold_sqls:
-                    tests[qid]["gold_sqls"] = gold_sqls[:]
+                case["gold_sqls"] = ensure_list_gold(r.get("gold_sql"))
 
-            tests[qid]["models"][model] = {
-                "pred_sql": pred_sql,
-                "metrics": metrics,
-                "passed_all": passed,
+            case["models"][model] = {
+                "pred_sql": r.get("pred_sql") or "",
+                "metrics": r.get("metrics") or [],
+                "passed_all": bool(r.get("passed_all")),
             }
 
-    return tests, files
+    return tests, files, summaries
 
 
-def metric_badge(m: Dict[str, Any]) -> str:
+def metric_badge(write: Callable[[str], Any], m: Dict[str, Any]) -> None:
     name = m.get("name", "")
     score = m.get("score")
     thr = m.get("threshold")
-    reason = (m.get("reason") or "").replace("<", "&lt;").replace(">", "&gt;")
+    reason = (m.get("reason") or "").translate(_ESC)
     ok = None
     try:
         if score is None or thr is None:
@@ -125,245 +354,244 @@ def metric_badge(m: Dict[str, Any]) -> str:
     except Exception:
         ok = None
 
-    if ok is True:
-        cls, icon, title = "ok", "✓", "pass"
-    elif ok is False:
-        cls, icon, title = "fail", "✗", "fail"
-    else:
-        cls, icon, title = "unk", "•", "n/a"
-
+    cls, icon, title = _BADGE_STATE[ok]
     s_score = "n/a" if score is None else f"{score:.3f}" if isinstance(score, (int, float)) else str(score)
     s_thr = "n/a" if thr is None else f"{thr:.3f}" if isinstance(thr, (int, float)) else str(thr)
-    return f"""
-      <div class="metric {cls}" title="{title}">
-        <span class="metric-name">{name}</span>
-        <span class="metric-icon">{icon}</span>
-        <span class="metric-score">{s_score}</span>
-        <span class="metric-thr">/ {s_thr}</span>
-        <span class="metric-reason">{reason}</span>
-      </div>
-    """.strip()
-
-
-def render_case(qkey: str, case: Dict[str, Any]) -> str:
+    write(_BADGE_TMPL % (cls, title, _esc(str(name)), icon, s_score, s_thr, reason))
+
+
+def render_case(write: Callable[[str], Any], qkey: str, case: Dict[str, Any]) -> None:
     q = (case.get("question") or "").strip()
-    golds: List[str] = case.get("gold_sqls") or []
+    golds = case.get("gold_sqls") or ()
+
+    write('<section class="case" id="')
+    write(_esc(qkey))
+    write('"><h3 class="q">Q. ')
+    write(escape(q))
+    write('</h3><div class="gold-wrap">')
 
     # Gold SQL blocks
-    gold_blocks = ""
     if golds:
-        blocks = []
         for i, g in enumerate(golds, 1):
-            g_html = g.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            blocks.append(f"""
-              <div class="code-card">
-                <div class="code-card-head">
-                  <span>Gold SQL #{i}</span>
-                  <button class="copy" data-copy="{g_html}">Copy</button>
-                </div>
-                <pre><code>{g_html}</code></pre>
-              </div>
-            """)
-        gold_blocks = "\n".join(blocks)
+            g_html = g.translate(_ESC)
+            write('<div class="code-card"><div class="code-card-head"><span>Gold SQL #')
+            write(str(i))
+            write('</span><button class="copy" data-copy="')
+            write(g_html)
+            write('">Copy</button></div><pre><code>')
+            write(g_html)
+            write("</code></pre></div>")
     else:
-        gold_blocks = """
-          <div class="code-card">
-            <div class="code-card-head"><span>Gold SQL</span></div>
-            <div class="muted">No gold SQL in report file</div>
-          </div>
-        """
+        write(
+            '<div class="code-card"><div class="code-card-head"><span>Gold SQL</span></div>'
+            '<div class="muted">No gold SQL in report file</div></div>'
+        )
+
+    write('</div><div class="grid">')
 
     # Model cards
-    model_cards = []
-    for model, info in case.get("models", {}).items():
+    models = case.get("models", {})
+    for model, info in models.items():
         pred = (info.get("pred_sql") or "").strip()
-        pred_html = pred.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        pred_html = pred.translate(_ESC)
         passed = info.get("passed_all", False)
-        metrics = info.get("metrics") or []
-
-        metrics_html = "\n".join(metric_badge(m) for m in metrics)
-
-        badge_cls = "pass" if passed else "fail"
-        badge_text = "ALL PASS" if passed else "NOT PASS"
-
-        model_cards.append(f"""
-          <div class="card">
-            <div class="card-head">
-              <div class="model">{model}</div>
-              <div class="pill {badge_cls}">{badge_text}</div>
-            </div>
-            <div class="code-card">
-              <div class="code-card-head">
-                <span>Prediction</span>
-                <button class="copy" data-copy="{pred_html}">Copy</button>
-              </div>
-              <pre><code>{pred_html or "-- (empty) --"}</code></pre>
-            </div>
-            <div class="metrics">
-              {metrics_html}
-            </div>
-          </div>
-        """)
-
-    if not model_cards:
-        model_cards.append("""
-          <div class="card">
-            <div class="card-head"><div class="model">No models</div></div>
-            <div class="muted">Place report JSONs under ./out to see predictions.</div>
-          </div>
-        """)
-
-    return f"""
-      <section class="case" id="{qkey}">
-        <h3 class="q">Q. {q}</h3>
-        <div class="gold-wrap">
-          {gold_blocks}
-        </div>
-        <div class="grid">
-          {''.join(model_cards)}
-        </div>
-      </section>
-    """
+        metrics = info.get("metrics") or ()
+
+        write('<div class="card"><div class="card-head"><div class="model">')
+        write(_esc(model))
+        write("</div>")
+        write(_PASS_PILL if passed else _FAIL_PILL)
+        write(
+            '</div><div class="code-card"><div class="code-card-head"><span>Prediction</span>'
+            '<button class="copy" data-copy="'
+        )
+        write(pred_html)
+        write('">Copy</button></div><pre><code>')
+        write(pred_html or "-- (empty) --")
+        write('</code></pre></div><div class="metrics">')
+        for m in metrics:
+            metric_badge(write, m)
+        write("</div></div>")
+
+    if not models:
+        write(
+            '<div class="card"><div class="card-head"><div class="model">No models</div></div>'
+            '<div class="muted">Place report JSONs under ./out to see predictions.</div></div>'
+        )
+
+    write("</div></section>\n")
+
+
+def _colibri_link() -> str:
+    # prefer site/colibri if already merged by workflow; fallback dbt/dist
+    site_page, dist_page = LINEAGE_PAGES
+    if site_page.exists():
+        return '<a class="btn" href="./colibri/" target="_blank">Open Lineage (colibri)</a>'
+    if dist_page.exists():
+        return '<a class="btn" href="../dbt/dist/" target="_blank">Open Lineage (colibri)</a>'
+    return ""
+
+
+def now_utc_str() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+
+def write_html(
+    write: Callable[[str], Any],
+    tests: Dict[str, Any],
+    report_files: List[Path],
+    summaries: Dict[str, Dict[str, int]] | None = None,
+    built_at: str | None = None,
+) -> None:
+    """Emit the page fragment by fragment through `write` (file.write, list.append, ...)."""
+    dt = built_at or now_utc_str()
+    # sort by numeric part of the key for stable, natural order
+    keys = sorted(tests, key=_idkey)
+
+    colibri_link = _colibri_link()
+
+    summaries = summaries or {}
+    files_list = "".join([
+        f"<code>{f.name}</code> ({summaries[f.name]['passed']}/{summaries[f.name]['total']} passed) "
+        if f.name in summaries
+        else f"<code>{f.name}</code> "
+        for f in report_files
+    ]) or "<span class='meta'>No report JSON found in ./out</span>"
+
+    write(_PAGE_PREFIX)
+    write(_PAGE_HEADER.format_map({"colibri_link": colibri_link, "dt": dt, "files_list": files_list}))
+
+    if keys:
+        write('<div class="nav">')
+        for k in keys:
+            title = (tests[k].get("question") or "").strip()
+            if len(title) > 40:
+                title = title[:40] + "…"
+            write('<a class="chip" href="#')
+            write(_esc(k))
+            write('">')
+            write(escape(title))
+            write("</a>")
+        write("</div>\n")
 
+    for k in keys:
+        render_case(write, k, tests[k])
 
-def render_html(tests: Dict[str, Any], report_files: List[Path]) -> str:
-    dt = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    # sort by key for stable order
-    items = sorted(tests.items(), key=lambda kv: kv[0])
+    write(_PAGE_TAIL)
 
-    cases_html = "\n".join(render_case(k, v) for k, v in items)
 
-    has_colibri = (ROOT / "site" / "colibri" / "index.html").exists() or (ROOT / "dbt" / "dist" / "index.html").exists()
+def render_html(
+    tests: Dict[str, Any],
+    report_files: List[Path],
+    summaries: Dict[str, Dict[str, int]] | None = None,
+    built_at: str | None = None,
+) -> str:
+    parts: List[str] = []
+    write_html(parts.append, tests, report_files, summaries, built_at)
+    return "".join(parts)
 
-    # Tiny JS for copy & anchor scrolling
-    js = """
-    <script>
-    document.addEventListener('click', (e) => {
-      const btn = e.target.closest('.copy');
-      if (!btn) return;
-      const text = btn.getAttribute('data-copy') || '';
-      navigator.clipboard.writeText(text.replaceAll('&lt;','<').replaceAll('&gt;','>').replaceAll('&amp;','&'))
-        .then(() => { btn.textContent = 'Copied'; setTimeout(()=>btn.textContent='Copy', 1200); })
-        .catch(() => { btn.textContent = 'Error'; setTimeout(()=>btn.textContent='Copy', 1200); });
-    });
-    </script>
-    """
 
-    css = """
-    <style>
-      :root { --bg:#0b0f14; --card:#111827; --muted:#9CA3AF; --fg:#E5E7EB; --pill:#374151; --ok:#10B981; --fail:#EF4444; --unk:#6B7280; --accent:#60A5FA; }
-      * { box-sizing: border-box; }
-      html, body { margin:0; padding:0; background:var(--bg); color:var(--fg); font: 16px/1.5 ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Noto Sans, Ubuntu; }
-      a { color: var(--accent); text-decoration: none; }
-      .container { max-width: 1100px; margin: 0 auto; padding: 24px 16px 80px; }
-      header { display:flex; align-items:center; justify-content:space-between; gap:12px; margin-bottom: 18px; }
-      header .title { font-size: 22px; font-weight: 700; letter-spacing:.2px; }
-      header .links { display:flex; gap:10px; flex-wrap:wrap; }
-      .btn { display:inline-flex; align-items:center; gap:8px; padding:8px 12px; border-radius:10px; background:#0f172a; border:1px solid #1f2937; color:#e5e7eb; font-size:13px; }
-      .btn:hover { background:#111827; }
-      .meta { color: var(--muted); font-size: 12px; margin-bottom: 18px; }
-
-      .nav { display:flex; gap:8px; flex-wrap:wrap; margin: 8px 0 22px; }
-      .chip { background:#0f172a; border:1px solid #1f2937; color:#cbd5e1; font-size:12px; padding:6px 10px; border-radius:999px; }
-      .chip:hover { background:#111827; }
-
-      section.case { background: #0c1220; border: 1px solid #1f2937; border-radius: 16px; padding:16px; margin: 14px 0 24px; }
-      section .q { margin: 0 0 10px; font-size: 18px; font-weight: 700; }
-
-      .gold-wrap { display:grid; grid-template-columns: 1fr; gap: 10px; margin: 10px 0 12px; }
-      @media(min-width: 720px) { .gold-wrap { grid-template-columns: repeat(2, 1fr); } }
-
-      .grid { display:grid; gap: 12px; grid-template-columns: 1fr; }
-      @media(min-width: 820px) { .grid { grid-template-columns: repeat(3, 1fr); } }
-
-      .card { background: var(--card); border:1px solid #1f2937; border-radius: 14px; padding: 12px; }
-      .card-head { display:flex; align-items:center; justify-content:space-between; margin-bottom: 8px; }
-      .card .model { font-weight: 700; letter-spacing: .2px; }
-      .pill { font-size:11px; padding:3px 8px; border-radius: 999px; border:1px solid var(--pill); color:#e5e7eb; }
-      .pill.pass { border-color: var(--ok); color: var(--ok); }
-      .pill.fail { border-color: var(--fail); color: var(--fail); }
-
-      .code-card { background:#0b1220; border:1px solid #1f2937; border-radius: 12px; }
-      .code-card + .code-card { margin-top: 8px; }
-      .code-card-head { display:flex; align-items:center; justify-content:space-between; padding:8px 10px; border-bottom:1px solid #1f2937; color:#cbd5e1; font-size:12px; }
-      .copy { background:#0f172a; border:1px solid #334155; color:#cbd5e1; padding:6px 10px; border-radius: 8px; font-size:12px; cursor:pointer; }
-      .copy:hover { background:#111827; }
-      pre { margin:0; padding:12px; overflow:auto; font-size:13px; }
-      code { font-family: ui-monospace, SFMono-Regular, Menlo, Consolas, "Liberation Mono", monospace; }
-
-      .metrics { display:flex; flex-direction:column; gap:6px; margin-top:10px; }
-      .metric { display:flex; align-items:center; gap:8px; font-size:12px; color:#cbd5e1; }
-      .metric .metric-name { min-width: 140px; color:#e5e7eb; font-weight:600; }
-      .metric .metric-icon { width:18px; text-align:center; }
-      .metric.ok .metric-icon { color: var(--ok); }
-      .metric.fail .metric-icon { color: var(--fail); }
-      .metric.unk .metric-icon { color: var(--unk); }
-      .metric .metric-score { font-variant-numeric: tabular-nums; }
-      .metric .metric-thr { color: #94a3b8; font-variant-numeric: tabular-nums; }
-      .metric .metric-reason { color:#9ca3af; overflow:hidden; text-overflow:ellipsis; white-space:nowrap; }
-
-      .code-card .muted, .card .muted { color: var(--muted); padding: 10px; }
-      footer { margin-top: 40px; color: #9CA3AF; font-size: 12px; text-align:center; }
-    </style>
-    """
+def _write_bytes(path: Path, data: bytes) -> None:
+    """Write bytes with raw os.write calls, bypassing the TextIOWrapper layer."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
-    nav_html = ""
-    if items:
-        chips = []
-        for k, v in items:
-            title = (v.get("question") or "").strip()
-            if len(title) > 40:
-                title = title[:40] + "…"
-            chips.append(f'<a class="chip" href="#{k}">{title}</a>')
-        nav_html = f'<div class="nav">{"".join(chips)}</div>'
 
-    colibri_link = ""
-    # prefer site/colibri if already merged by workflow; fallback dbt/dist
-    if (ROOT / "site" / "colibri" / "index.html").exists():
-        colibri_link = '<a class="btn" href="./colibri/" target="_blank">Open Lineage (colibri)</a>'
-    elif (ROOT / "dbt" / "dist" / "index.html").exists():
-        colibri_link = '<a class="btn" href="../dbt/dist/" target="_blank">Open Lineage (colibri)</a>'
-
-    files_list = "".join(f"<code>{f.name}</code> " for f in report_files) or "<span class='meta'>No report JSON found in ./out</span>"
-
-    return f"""<!doctype html>
-<html lang="ko">
-<meta charset="utf-8" />
-<meta name="viewport" content="width=device-width, initial-scale=1" />
-<title>Text2SQL — Model Comparison Dashboard</title>
-{css}
-<body>
-  <div class="container">
-    <header>
-      <div class="title">Text2SQL — Model Comparison</div>
-      <div class="links">
-        <a class="btn" href="https://github.com/kyungjunleeme/Text2SQL" target="_blank">GitHub</a>
-        {colibri_link}
-      </div>
-    </header>
-
-    <div class="meta">Built at {dt}. Reports loaded: {files_list}</div>
-
-    {nav_html}
-
-    {cases_html}
-
-    <footer>
-      Generated from ./out/*.json — each case shows Gold SQL and model predictions.<br/>
-      Use the chips to jump between questions. Click “Copy” to copy SQL.
-    </footer>
-  </div>
-  {js}
-</body>
-</html>
-"""
+def _build_digest(files: List[Path]) -> str:
+    """Content hash of everything the page is rendered from: reports, lineage link, this script."""
+    h = hashlib.sha256(Path(__file__).read_bytes())
+    h.update(_colibri_link().encode("utf-8"))
+    for f in files:
+        h.update(f.name.encode("utf-8") + b"\0")
+        fh_hash = hashlib.sha256()  # hashlib.file_digest is 3.11+; requires-python allows 3.10
+        with open(f, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                fh_hash.update(chunk)
+        h.update(fh_hash.digest())
+    return h.hexdigest()
+
+
+def _write_gzip(src: Path, dst: Path) -> None:
+    """gzip -9 src into dst; mtime=0 keeps the archive byte-identical for identical pages."""
+    tmp = dst.with_name(dst.name + ".tmp")
+    with open(src, "rb") as fin, open(tmp, "wb") as raw:
+        with gzip.GzipFile(filename="", mode="wb", compresslevel=9, fileobj=raw, mtime=0) as gz:
+            shutil.copyfileobj(fin, gz, 1 << 20)
+    os.replace(tmp, dst)
+
+
+def _lineage_state() -> str:
+    """Which lineage pages exist, e.g. "10"; a deleted page leaves no mtime to compare."""
+    return "".join("1" if p.exists() else "0" for p in LINEAGE_PAGES)
+
 
+def _write_stamp(out: Path, digest: str) -> None:
+    st = out.stat()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    PAGE_STAMP.write_text(f"{digest} {st.st_mtime_ns} {st.st_size} {_lineage_state()}", encoding="utf-8")
 
-def main() -> None:
-    tests, files = load_reports()
-    html = render_html(tests, files)
+
+def _inputs_older_than(entries: List[os.DirEntry], mtime_ns: int) -> bool:
+    """True if no report, ./out listing, lineage page or this script changed after mtime_ns."""
+    newest = max((e.stat().st_mtime_ns for e in entries), default=0)
+    for p in (OUT_DIR, Path(__file__), *LINEAGE_PAGES):
+        try:
+            newest = max(newest, p.stat().st_mtime_ns)
+        except FileNotFoundError:
+            pass
+    return newest < mtime_ns
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Build the static dashboard at ./site/index.html")
+    ap.add_argument("--force", action="store_true", help="render even if the reports are unchanged")
+    args = ap.parse_args(argv)
+
+    copy_reports_into_site()
     out = SITE_DIR / "index.html"
-    out.write_text(html, encoding="utf-8")
+    entries = _scan_json(OUT_DIR)
+    # the stamp only counts if index.html is untouched since it was written, every page it
+    # produced is still there and the same lineage pages exist as at that build
+    try:
+        st = out.stat()
+        stamp = PAGE_STAMP.read_text(encoding="utf-8").split()
+        stamped = (
+            stamp[1:] == [str(st.st_mtime_ns), str(st.st_size), _lineage_state()]
+            and PAGE_GZ.exists()
+            and (SITE_DIR / ".nojekyll").exists()
+        )
+    except OSError:
+        stamped = False
+    stamped = stamped and not args.force
+
+    # cheap check first: nothing modified since the page was written (stats come from scandir)
+    if stamped and _inputs_older_than(entries, st.st_mtime_ns):
+        print(f"✅ Site up to date: {out}")
+        return
+    # otherwise same inputs as the last build by content -> nothing to render either
+    digest = _build_digest([Path(e.path) for e in entries])
+    if stamped and stamp[0] == digest:
+        # bump the page past the touched inputs so the next run takes the mtime path
+        os.utime(out)
+        _write_stamp(out, digest)
+        print(f"✅ Site unchanged (same reports): {out}")
+        return
+
+    tests, files, summaries = load_reports()
+    built_at = now_utc_str()
+    # stream straight to disk (1 MB buffer batches the small writes), then swap in
+    tmp = out.with_name(out.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8", buffering=1 << 20) as fh:
+        write_html(fh.write, tests, files, summaries, built_at)
+    os.replace(tmp, out)
+    _write_gzip(out, PAGE_GZ)
+    _write_bytes(SITE_DIR / ".nojekyll", b"")
+    _write_stamp(out, digest)
     print(f"✅ Site generated at: {out}")
     print("Open ./site/index.html")
 
@@ -1,4 +1,6 @@
-import os, json
+import os
+from pathlib import Path
+from tsql_eval.jsonio import loads as _loads
 from tsql_eval.backends.sqlalchemy_backend import SQLAlchemyBackend
 from tsql_eval.metrics.executable_sql import ExecutableSQLMetric
 from tsql_eval.metrics.execution_accuracy import ExecutionAccuracyMetric
@@ -10,8 +12,8 @@ def main():
         import scripts.setup_db as setup
         setup.main()
     backend = SQLAlchemyBackend("sqlite:///./data/sample.db")
-    tcs = json.load(open("data/testcases_sample.json","r",encoding="utf-8"))
-    preds = {p["id"]: p["pred_sql"] for p in json.load(open("predictions/sample_preds.json","r",encoding="utf-8"))}
+    tcs = _loads(Path("data/testcases_sample.json").read_bytes())
+    preds = {p["id"]: p["pred_sql"] for p in _loads(Path("predictions/sample_preds.json").read_bytes())}
     tc = tcs[0]; pred_sql = preds[tc["id"]]
     case_like = type("Case",(),{})(); case_like.output = pred_sql
     m1 = ExecutableSQLMetric(backend)
@@ -25,23 +25,11 @@ def main():
     # 파일 리스트를 SQL 리터럴 리스트로 구성
     files_sql = ", ".join(f"'{u}'" for u in GCS_FILES)
 
-    print("⏳ Loading raw TSV.GZ -> nyc._trips_raw (safe all_varchar) ...")
+    # raw(all_varchar) 중간 테이블 없이 한 번의 스캔으로 읽으면서 바로 캐스팅
+    # - all_varchar + try_cast 는 유지: 깨진 값은 행 단위 스킵이 아니라 NULL 처리
+    print("⏳ Loading TSV.GZ -> nyc.trips_small (single pass) ...")
+    con.execute(f"SET threads = {os.cpu_count() or 1}")
     con.execute(f"""
-        CREATE OR REPLACE TABLE nyc._trips_raw AS
-        SELECT *
-        FROM read_csv_auto(
-            [{files_sql}],
-            delim='\t',
-            header=TRUE,
-            sample_size=-1,         -- 전체 샘플링
-            all_varchar=TRUE,       -- 인코딩/타입 꼬임 방지
-            ignore_errors=TRUE,     -- 깨진 라인 스킵
-            compression='gzip'
-        );
-    """)
-
-    print("⏳ Casting -> nyc.trips_small ...")
-    con.execute("""
         CREATE OR REPLACE TABLE nyc.trips_small AS
         SELECT
             try_cast(trip_id AS BIGINT)                    AS trip_id,
@@ -61,14 +49,22 @@ def main():
             nullif(payment_type, '')                        AS payment_type,
             nullif(pickup_ntaname, '')                      AS pickup_ntaname,
             nullif(dropoff_ntaname, '')                     AS dropoff_ntaname
-        FROM nyc._trips_raw;
+        FROM read_csv_auto(
+            [{files_sql}],
+            delim='\t',
+            header=TRUE,
+            sample_size=-1,         -- 전체 샘플링
+            all_varchar=TRUE,       -- 인코딩/타입 꼬임 방지
+            ignore_errors=TRUE,     -- 깨진 라인 스킵
+            compression='gzip'
+        );
     """)
 
     print("🔧 Indexing ...")
     con.execute("CREATE INDEX IF NOT EXISTS idx_pickup_dt  ON nyc.trips_small(pickup_datetime)")
     con.execute("CREATE INDEX IF NOT EXISTS idx_dropoff_dt ON nyc.trips_small(dropoff_datetime)")
 
-    print("🧹 Cleaning raw table ...")
+    # 이전 버전이 남긴 raw 테이블 정리
     con.execute("DROP TABLE IF EXISTS nyc._trips_raw")
 
     n = con.execute("SELECT COUNT(*) FROM nyc.trips_small").fetchone()[0]
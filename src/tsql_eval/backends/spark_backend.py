@@ -1,19 +1,57 @@
+import threading
+
 import pandas as pd
 from pyhive import hive
 
+# HS2 FetchResults 한 번에 받아올 행 수 (pyhive 기본값 1000 은 왕복이 너무 잦음)
+FETCH_BATCH_ROWS = 10000
+
 class SparkBackend:
     def __init__(self, host: str, port: int = 10000, username: str | None = None,
                  database: str = "default", auth: str = "NONE"):
         self.kw = dict(host=host, port=port, username=username, database=database, auth=auth)
+        # HS2 커넥션(TCP + SASL 핸드셰이크)은 스레드별로 1회만 열고 재사용
+        self._local = threading.local()
+        self._conns: list = []
+        self._lock = threading.Lock()
 
     def _conn(self):
-        return hive.Connection(**self.kw)
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            c = hive.Connection(**self.kw)
+            self._local.conn = c
+            with self._lock:
+                self._conns.append(c)
+        return c
+
+    def close(self) -> None:
+        """캐시된 HS2 커넥션(모든 스레드)을 정리."""
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for c in conns:
+            try:
+                c.close()
+            except Exception:
+                pass
+        self._local = threading.local()
 
     def exec(self, sql: str):
-        with self._conn() as c:
-            cur = c.cursor()
+        with self._conn().cursor() as cur:
             cur.execute(sql)
 
+    def _fetch(self, sql: str):
+        # 커서에서 큰 배치로 직접 받는다 (pd.read_sql 의 DBAPI fallback 경로 회피)
+        with self._conn().cursor(arraysize=FETCH_BATCH_ROWS) as cur:
+            cur.execute(sql)
+            rows = cur.fetchall()
+            cols = [d[0] for d in cur.description or ()]
+        return rows, cols
+
+    def fetch_rows(self, sql: str) -> list[tuple]:
+        """결과를 list[tuple] 그대로 반환 (행 비교만 필요할 때 DataFrame 생성 생략)."""
+        rows, _ = self._fetch(sql)
+        return [tuple(r) for r in rows]
+
     def fetch_df(self, sql: str) -> pd.DataFrame:
-        with self._conn() as c:
-            return pd.read_sql(sql, c)
+        rows, cols = self._fetch(sql)
+        return pd.DataFrame.from_records(rows, columns=cols)
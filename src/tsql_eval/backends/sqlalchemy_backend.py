@@ -8,9 +8,11 @@ SQLAlchemy 기반 백엔드.
 """
 
 from __future__ import annotations
-from typing import Any, List, Tuple
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple
 import decimal
 import os
+import threading
 
 import numpy as np
 import pandas as pd  # 다른 DB용 경로에서 사용될 수 있어 import 유지
@@ -39,6 +41,23 @@ def _to_python_scalar(x: Any) -> Any:
         return str(x)
 
 
+# fetchall()이 이미 해시 가능한 파이썬 기본형으로 돌려주는 DuckDB 스칼라 타입들 (변환 불필요).
+# 타입 이름이 정확히 일치할 때만 건너뜀 (TIMESTAMP[] 같은 LIST/ARRAY 는 list 로 나오므로 제외)
+_DUCKDB_NATIVE_TYPES = frozenset({
+    "BOOLEAN", "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "DOUBLE", "VARCHAR", "DATE", "INTERVAL", "UUID", "BLOB",
+    "TIME", "TIME WITH TIME ZONE",
+    "TIMESTAMP", "TIMESTAMP WITH TIME ZONE", "TIMESTAMP_S", "TIMESTAMP_MS", "TIMESTAMP_NS",
+})
+
+
+def _needs_conversion(type_code: Any) -> bool:
+    """DECIMAL(→float), LIST/ARRAY/STRUCT/MAP/UNION(unhashable→str) 등 정규화가 필요한 컬럼인지."""
+    name = str(type_code).strip().upper()
+    return "[" in name or name not in _DUCKDB_NATIVE_TYPES
+
+
 class SQLAlchemyBackend(Backend):
     """SQLAlchemy Engine을 이용해 쿼리를 실행하는 백엔드."""
 
@@ -57,26 +76,101 @@ class SQLAlchemyBackend(Backend):
             else:
                 self._duckdb_dbpath = ":memory:"
 
+        # DuckDB 커넥션은 스레드별로 1회만 열고 재사용 (쿼리마다 파일 open/카탈로그 로드 비용 제거)
+        self._local = threading.local()
+        self._duckdb_conns: list = []
+        self._lock = threading.Lock()
+
+    def _duckdb_con(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            import duckdb
+            con = duckdb.connect(self._duckdb_dbpath)
+            self._local.con = con
+            with self._lock:
+                self._duckdb_conns.append(con)
+        return con
+
+    def close(self) -> None:
+        """캐시된 DuckDB 커넥션(모든 스레드)과 엔진 풀을 정리."""
+        with self._lock:
+            conns, self._duckdb_conns = self._duckdb_conns, []
+        for con in conns:
+            try:
+                con.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+        self.engine.dispose()
+
+    @contextmanager
+    def session(self) -> Iterator["SQLAlchemyBackend"]:
+        """
+        블록 동안 이 스레드의 execute 가 DBAPI 커넥션 하나를 계속 쓰도록 고정.
+        - 쿼리마다 반복되던 풀 checkout/checkin 제거 (문장마다 rollback 은 그대로 수행)
+        - DuckDB 는 이미 스레드별 커넥션을 재사용하므로 아무것도 하지 않음
+        """
+        if self._is_duckdb or getattr(self._local, "raw", None) is not None:
+            yield self
+            return
+        conn = self.engine.raw_connection()
+        self._local.raw = conn
+        try:
+            yield self
+        finally:
+            self._local.raw = None
+            conn.close()
+
     def execute(self, sql: str) -> List[Tuple[Any, ...]]:
         """
         SQL 실행 후 결과를 리스트[튜플]로 반환.
-        - DuckDB: duckdb.connect 로 직접 실행 (SQLAlchemy 경유 시 타입 메타 충돌 회피)
-        - 그 외: 기존 exec_driver_sql 경로
+        - DuckDB: 캐시된 duckdb 네이티브 커넥션으로 직접 실행, 문장마다 rollback (SQLAlchemy 경유 시 타입 메타 충돌 회피)
+        - 그 외: 엔진 풀의 DBAPI 커서로 실행
         """
         if self._is_duckdb:
-            import duckdb
-            con = duckdb.connect(self._duckdb_dbpath)
+            con = self._duckdb_con()
+            # 문장마다 트랜잭션으로 감싸고 rollback: 예측 간에 임시 테이블/쓰기/실패한 트랜잭션이 남지 않게
+            con.begin()
             try:
-                rows = con.execute(sql).fetchall()  # List[Tuple]
-                # 각 셀을 파이썬 기본형으로 정규화
-                return [tuple(_to_python_scalar(v) for v in row) for row in rows]
+                cur = con.execute(sql)
+                rows = cur.fetchall()  # List[Tuple]
+                description = cur.description or ()
             finally:
-                con.close()
+                try:
+                    con.rollback()
+                except Exception:
+                    pass  # 문장이 스스로 COMMIT/ROLLBACK 한 경우
+            # 컬럼 타입으로 변환 대상 컬럼만 골라 한 번에 정규화 (셀 단위 isinstance 검사 생략)
+            conv = [i for i, d in enumerate(description) if _needs_conversion(d[1])]
+            if not conv:
+                return rows
+            out = []
+            for row in rows:
+                r = list(row)
+                for i in conv:
+                    r[i] = _to_python_scalar(r[i])
+                out.append(tuple(r))
+            return out
 
-        # 기타 DB는 기존 경로
-        with self.engine.connect() as conn:
-            res = conn.exec_driver_sql(sql)
-            return [tuple(r) for r in res.fetchall()]
+        # 기타 DB: 풀의 DBAPI 커넥션 커서로 직접 실행 (Result/Row 래핑 생략)
+        pinned = getattr(self._local, "raw", None)
+        conn = pinned if pinned is not None else self.engine.raw_connection()
+        try:
+            cur = conn.cursor()
+            try:
+                cur.execute(sql)
+                if cur.description is None:
+                    # exec_driver_sql(...).fetchall() 과 동일하게 행이 없는 문장은 실패 처리
+                    from sqlalchemy.exc import ResourceClosedError
+                    raise ResourceClosedError("This result object does not return rows.")
+                return [tuple(r) for r in cur.fetchall()]
+            finally:
+                cur.close()
+        finally:
+            if pinned is None:
+                conn.close()  # 풀로 반환 (reset-on-return 으로 rollback)
+            else:
+                conn.rollback()  # 세션 중에도 문장 간 격리는 풀 반환 때와 동일하게
 
     # ✅ 호환용 별칭: 일부 코드가 .exec(...)를 호출함
     def exec(self, sql: str) -> List[Tuple[Any, ...]]:
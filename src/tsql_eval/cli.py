@@ -1,25 +1,42 @@
-import click, json, os
-from .runner import run_eval
+import argparse, json, os
 
-@click.group()
-def main():
-    """Text-to-SQL evaluation CLI (DeepEval-based)."""
+def _existing_path(p):
+    if not os.path.exists(p):
+        raise argparse.ArgumentTypeError(f"Path '{p}' does not exist.")
+    return p
+
+def _parser():
+    parser = argparse.ArgumentParser(prog="tsql-eval", description="Text-to-SQL evaluation CLI (DeepEval-based).")
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    p = sub.add_parser("run", help="Run evaluation over testcases and predictions.",
+                       description="Run evaluation over testcases and predictions.")
+    p.add_argument("--testcases", dest="testcases_path", required=True, type=_existing_path, metavar="PATH", help="JSON list of {id, question, gold_sql}")
+    p.add_argument("--predictions", dest="predictions_path", required=True, type=_existing_path, metavar="PATH", help="JSON list of {id, pred_sql}")
+    p.add_argument("--dialect", default=None, help="SQL dialect hint for parser (e.g., trino, spark, snowflake, bigquery)")
+    p.add_argument("--weights", default=None, help="JSON dict of component weights for ComponentMatchMetric")
+    p.add_argument("--report", dest="report", default=None, help="Write detailed JSON report to this path")
+    p.set_defaults(func=run)
+    return parser
 
-@main.command()
-@click.option("--testcases", "testcases_path", required=True, type=click.Path(exists=True), help="JSON list of {id, question, gold_sql}")
-@click.option("--predictions", "predictions_path", required=True, type=click.Path(exists=True), help="JSON list of {id, pred_sql}")
-@click.option("--dialect", default=None, help="SQL dialect hint for parser (e.g., trino, spark, snowflake, bigquery)")
-@click.option("--weights", default=None, help="JSON dict of component weights for ComponentMatchMetric")
-@click.option("--report", "report", default=None, help="Write detailed JSON report to this path")
 def run(testcases_path, predictions_path, dialect, weights, report):
     """Run evaluation over testcases and predictions."""
+    # deferred so `--help` does not pull in sqlglot/deepeval/pandas
+    from .jsonio import dump_json
+    from .runner import run_eval
     weights_dict = json.loads(weights) if weights else None
     results = run_eval(testcases_path, predictions_path, dialect=dialect, component_weights=weights_dict)
     if report:
         os.makedirs(os.path.dirname(report), exist_ok=True)
-        with open(report, "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        dump_json(results, report)
         print(f"Report written to {report}")
 
+def main(argv=None):
+    """Text-to-SQL evaluation CLI (DeepEval-based)."""
+    args = vars(_parser().parse_args(argv))
+    func = args.pop("func")
+    args.pop("command")
+    func(**args)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,21 @@
+import json
+
+try:  # optional: orjson 은 bytes 를 바로 파싱/직렬화 (없으면 표준 json)
+    import orjson
+except ImportError:
+    orjson = None
+
+loads = orjson.loads if orjson is not None else json.loads
+
+def load_json(path: str):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+def dump_json(obj, path: str) -> None:
+    """들여쓰기 2칸, 비ASCII 그대로(UTF-8) 저장."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
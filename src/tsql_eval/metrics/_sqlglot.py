@@ -0,0 +1,81 @@
+"""sqlglot 공용 헬퍼: 방언 객체와 (스레드별) Tokenizer/Parser 를 재사용해 파싱.
+
+TSQL_EVAL_FAST_SQL=1 이고 libsqlglot(C++ 구현, sqlglot 호환 API)이 설치돼 있으면
+parse_one/transpile/expressions 를 그쪽으로 위임한다. 없으면 조용히 sqlglot 사용.
+"""
+
+import os
+import re
+import threading
+from functools import lru_cache
+
+import sqlglot
+from sqlglot.dialects.dialect import Dialect
+from sqlglot.errors import ParseError
+
+_fast = None
+if os.getenv("TSQL_EVAL_FAST_SQL", "0") == "1":
+    try:
+        import libsqlglot as _fast
+    except ImportError:
+        _fast = None
+
+if _fast is not None:
+    exp = _fast.expressions
+else:
+    from sqlglot import expressions as exp
+
+_local = threading.local()
+
+_TRAILING_SEMI_RE = re.compile(r"[\s;]+$")
+
+
+def literal_key(sql: str) -> str:
+    """파싱 없이 비교할 키: 앞뒤 공백과 끝의 ';' 만 제거.
+    대소문자/내부 공백은 문자열 리터럴 안에서 의미가 있으므로 건드리지 않음."""
+    return _TRAILING_SEMI_RE.sub("", (sql or "").lstrip())
+
+
+@lru_cache(maxsize=None)
+def get_dialect(dialect: str | None) -> Dialect:
+    """방언 이름 → Dialect 인스턴스 (문자열 해석/클래스 조회를 호출마다 반복하지 않음)."""
+    return Dialect.get_or_raise(dialect)
+
+
+def parse_one(sql: str, dialect: str | None):
+    """sqlglot.parse_one(sql, read=dialect) 와 같은 결과. Tokenizer/Parser 는 parse 마다 reset 되므로 재사용."""
+    if _fast is not None:
+        return _fast.parse_one(sql, read=dialect)
+    tools = getattr(_local, "tools", None)
+    if tools is None:
+        tools = _local.tools = {}
+    pair = tools.get(dialect)
+    if pair is None:
+        d = get_dialect(dialect)
+        pair = tools[dialect] = (d.tokenizer(), d.parser())
+    tokenizer, parser = pair
+    result = parser.parse(tokenizer.tokenize(sql), sql)
+    if not result or result[0] is None:
+        raise ParseError(f"No expression was parsed from '{sql}'")
+    if len(result) > 1:
+        # 여러 문장: 감싸는 방식이 sqlglot 버전마다 달라 원래 경로에 맡김
+        return sqlglot.parse_one(sql, read=get_dialect(dialect))
+    return result[0]
+
+
+def node_sql(node) -> str:
+    """node.sql(dialect=None, normalize=True) 와 같은 결과. Generator 는 스레드별로 하나만 만들어 재사용."""
+    if _fast is not None:
+        return node.sql(dialect=None, normalize=True)
+    gen = getattr(_local, "normalize_gen", None)
+    if gen is None:
+        gen = _local.normalize_gen = get_dialect(None).generator(normalize=True)
+    return gen.generate(node)
+
+
+def transpile(sql: str, dialect: str | None, **opts) -> list:
+    """같은 방언으로 읽고 쓰는 sqlglot.transpile."""
+    if _fast is not None:
+        return _fast.transpile(sql, read=dialect, write=dialect, **opts)
+    d = get_dialect(dialect)
+    return sqlglot.transpile(sql, read=d, write=d, **opts)
@@ -10,47 +10,58 @@ except Exception:
             self.input = input
             self.output = output
 
-import sqlglot
-from sqlglot import expressions as exp
+from functools import lru_cache
+
+from ._sqlglot import exp, literal_key, node_sql, parse_one
 
 def _safe_parse(sql: str, dialect: str | None):
-    return sqlglot.parse_one(sql, read=dialect)
+    return parse_one(sql, dialect)
 
 def _collect_components(tree: exp.Expression):
     comps = {"tables": set(), "columns": set(), "aggregates": set(), "joins": set(), "predicates": set(), "group_by": set(), "order_by": set()}
     if tree is None: return comps
-    for t in tree.find_all(exp.Table):
-        comps["tables"].add((t.alias_or_name or t.name or "").lower())
-    for se in tree.find_all(exp.Select):
-        for sel in se.expressions:
-            agg = sel.find(exp.AggFunc)
-            if agg: comps["aggregates"].add(agg.key.lower())
-            for ident in sel.find_all(exp.Identifier):
-                comps["columns"].add(ident.name.lower())
-    for j in tree.find_all(exp.Join):
-        kind = (j.kind or "join").lower()
-        on = j.args.get("on")
-        key = kind + (":" + on.sql(dialect=None, normalize=True) if on else "")
-        comps["joins"].add(key)
+    # 한 번의 반복(BFS) 순회로 Table/Select/Join 을 모두 분류 (find_all 을 종류별로 3번 돌지 않음)
+    for n in tree.walk():
+        if isinstance(n, exp.Table):
+            comps["tables"].add((n.alias_or_name or n.name or "").lower())
+        elif isinstance(n, exp.Select):
+            for sel in n.expressions:
+                agg = sel.find(exp.AggFunc)
+                if agg: comps["aggregates"].add(agg.key.lower())
+                for ident in sel.find_all(exp.Identifier):
+                    comps["columns"].add(ident.name.lower())
+        elif isinstance(n, exp.Join):
+            kind = (n.kind or "join").lower()
+            on = n.args.get("on")
+            key = kind + (":" + node_sql(on) if on else "")
+            comps["joins"].add(key)
     where = tree.args.get("where")
-    if where: comps["predicates"].add(where.sql(dialect=None, normalize=True))
+    if where: comps["predicates"].add(node_sql(where))
     having = tree.args.get("having")
-    if having: comps["predicates"].add(having.sql(dialect=None, normalize=True))
+    if having: comps["predicates"].add(node_sql(having))
     gb = tree.args.get("group")
     if gb:
         for e in gb.expressions:
-            comps["group_by"].add(e.sql(dialect=None, normalize=True).lower())
+            comps["group_by"].add(node_sql(e).lower())
     ob = tree.args.get("order")
     if ob:
         for e in ob.expressions:
-            comps["order_by"].add(e.sql(dialect=None, normalize=True).lower())
+            comps["order_by"].add(node_sql(e).lower())
     return comps
 
+@lru_cache(maxsize=4096)
+def _components_for(sql: str, dialect: str | None) -> dict:
+    """parse + collect, memoized on (sql, dialect): the same gold SQL recurs across cases/metrics.
+    Returns frozensets shared between callers -- treat the result as read-only."""
+    comps = _collect_components(_safe_parse(sql, dialect))
+    return {k: frozenset(v) for k, v in comps.items()}
+
 def _jaccard(a:set, b:set) -> float:
     if not a and not b: return 1.0
     if not a or not b: return 0.0
-    inter = len(a & b); union = len(a | b)
-    return inter / union if union else 0.0
+    # |A ∪ B| = |A| + |B| - |A ∩ B|: union 집합을 따로 만들지 않음
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
 
 class ComponentMatchMetric(BaseMetric):
     """Partial scoring metric: weighted Jaccard over SQL components.
@@ -67,20 +78,34 @@ class ComponentMatchMetric(BaseMetric):
         self.score = None
         self.reason = None
         self.details = None
+        # gold 는 인스턴스 수명 동안 고정: 후보별 component 를 한 번만 계산 (파싱 실패 후보는 제외)
+        self._weight_items = tuple(self.weights.items())
+        self._total_w = sum(w for _, w in self._weight_items)
+        self._gold_comps = []
+        self._gold_keys = set()  # 파싱된 후보만: 파싱 못 한 gold 와 글자가 같다고 만점을 주지 않음
+        for cand in ([gold_sql] if isinstance(gold_sql, str) else list(gold_sql)):
+            try:
+                self._gold_comps.append(_components_for(cand, dialect))
+            except Exception:
+                continue
+            self._gold_keys.add(literal_key(cand))
 
     def measure(self, test_case: LLMTestCase) -> float:
         pred_sql = ((getattr(test_case,"actual_output",None) or getattr(test_case,"output","")) or "").strip()
+        # 텍스트가 gold 와 그대로 같으면 모든 component 가 일치: 파싱 생략
+        pred_key = literal_key(pred_sql)
+        if pred_key and pred_key in self._gold_keys and self._total_w != 0:
+            self.score = 1.0; self.reason = "literal-equal"
+            self.details = {"per_component": {k: 1.0 for k, _ in self._weight_items}}
+            return self.score
         try:
-            pred_t = _safe_parse(pred_sql, self.dialect)
-            p = _collect_components(pred_t)
-            candidates = [self.gold_sql] if isinstance(self.gold_sql, str) else list(self.gold_sql)
+            p = _components_for(pred_sql, self.dialect)
             best_score = 0.0; best_detail = None
-            for cand in candidates:
+            for g in self._gold_comps:
                 try:
-                    gold_t = _safe_parse(cand, self.dialect); g = _collect_components(gold_t)
                     scores = {}; total_w = 0.0; acc = 0.0
-                    for k, w in self.weights.items():
-                        s = _jaccard(p.get(k,set()), g.get(k,set()))
+                    for k, w in self._weight_items:
+                        s = _jaccard(p.get(k,frozenset()), g.get(k,frozenset()))
                         scores[k] = s; total_w += w; acc += s * w
                     score = acc / total_w if total_w else 0.0
                     if score > best_score: best_score, best_detail = score, scores
@@ -11,9 +11,18 @@ except Exception:
             self.output = output
 
 class ExecutableSQLMetric(BaseMetric):
-    def __init__(self, backend):
+    def __init__(self, backend, check_mode: str = "execute", explain_cache: dict | None = None):
+        """
+        check_mode="explain" 이면 쿼리를 실제로 돌리지 않고 EXPLAIN 결과만 본다.
+        explain_cache: SQL → (ok, reason). 한 번의 평가 실행 안에서 케이스마다 같은 dict 를 넘기면
+        반복되는 예측은 DB 를 다시 타지 않음 (실행이 끝나면 함께 버려지므로 스키마 변경/백엔드 수명과 무관).
+        """
+        if check_mode not in ("execute", "explain"):
+            raise ValueError(f"unknown check_mode: {check_mode!r}")
         self.name = "executable_sql"
         self.backend = backend
+        self.check_mode = check_mode
+        self._explain_cache = {} if explain_cache is None else explain_cache
         # deepeval가 기대하는 표준 필드
         self.threshold = 1.0
         self.strict = False
@@ -26,6 +35,10 @@ class ExecutableSQLMetric(BaseMetric):
         if not sql:
             self.score, self.reason = 0.0, "empty sql"
             return self.score
+        if self.check_mode == "explain":
+            ok, self.reason = self._explain_ok(sql)
+            self.score = 1.0 if ok else 0.0
+            return self.score
         try:
             self.backend.exec(sql)
             self.score, self.reason = 1.0, "ok"
@@ -33,6 +46,18 @@ class ExecutableSQLMetric(BaseMetric):
             self.score, self.reason = 0.0, f"exec error: {e}"
         return self.score
 
+    def _explain_ok(self, sql: str) -> tuple[bool, str]:
+        """EXPLAIN 으로 파싱/플래닝만 확인 (실행 X). 같은 SQL 은 explain_cache 에서 바로 반환."""
+        hit = self._explain_cache.get(sql)
+        if hit is None:
+            try:
+                self.backend.exec(f"EXPLAIN {sql}")
+                hit = (True, "ok")
+            except Exception as e:
+                hit = (False, f"exec error: {e}")
+            self._explain_cache[sql] = hit
+        return hit
+
     async def a_measure(self, test_case: LLMTestCase):
         return self.measure(test_case)
 
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import math
 from decimal import Decimal
-from typing import Any, Iterable, List, Tuple
+from typing import Any, Callable, Iterable, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -11,12 +12,67 @@ from deepeval.metrics import BaseMetric
 from deepeval.test_case import LLMTestCase
 
 
+# _canon_rows 에서 변환 없이 그대로 두는 셀 타입 (type() 정확 일치로 검사)
+_PLAIN_TYPES = frozenset({str, int, bool, type(None)})
+
+
+def _canon_cell(v: Any) -> Any:
+    """셀 하나를 비교용으로 정규화: NaN→None, numpy 스칼라→파이썬, Decimal→float, float 는 소수 6자리."""
+    if type(v) is float:
+        return None if v != v else round(v, 6)
+    if v is None:
+        return None
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, Decimal):
+        v = float(v)
+    if isinstance(v, float):
+        v = round(v, 6)
+    return v
+
+
+_NUMBER_TYPES = (bool, int, float)
+
+
+def _row_sort_key(row: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    """비교 불가 타입이 섞여도 정렬되는 키: None 이 먼저, 숫자끼리는 값 순서, 그 외는 타입 이름별로 묶어 값 순서.
+    sorted(out) 이 성공하는 입력에서는 같은 순서를 만든다."""
+    return tuple(
+        (0,) if v is None else (1, "", v) if isinstance(v, _NUMBER_TYPES) else (2, type(v).__name__, v)
+        for v in row
+    )
+
+
+class _Once:
+    """인자 없는 함수를 처음 호출될 때 한 번만 실행하고, 결과(또는 예외)를 이후 호출에 재사용."""
+
+    def __init__(self, fn: Callable[[], Any]) -> None:
+        self._fn = fn
+        self._done = False
+        self._value: Any = None
+        self._error: Exception | None = None
+
+    def __call__(self) -> Any:
+        if not self._done:
+            try:
+                self._value = self._fn()
+            except Exception as e:
+                self._error = e
+            self._done = True
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
 class ExecutionAccuracyMetric(BaseMetric):
     """
     Execute gold SQL vs. predicted SQL and compare results.
 
-    - 1차: DataFrame 정규화 비교(_compare_df)
-    - 실패 시: 행(tuple) 정규화 비교(_compare_rows) 폴백
+    - 백엔드가 DataFrame 을 직접 주면(fetch_df): 1차 DataFrame 정규화 비교(_compare_df), 실패 시 행 비교 폴백
+    - 행만 주는 백엔드 + ignore_order: 1차 행(tuple) 정규화 비교(_compare_rows), 실패 시 DataFrame 비교 폴백
+      (어차피 행으로 DataFrame 을 만드는 것이라 pandas 생성/정렬 비용만 드는 경로를 뒤로)
     - float/Decimal/np.generic/NaN 정규화, 컬럼명 소문자화, 정렬 무시 옵션 지원
     """
 
@@ -45,12 +101,11 @@ class ExecutionAccuracyMetric(BaseMetric):
 
     # ----------------------- 내부 유틸 -----------------------
 
-    def _norm_df(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _norm_df(self, df: pd.DataFrame, sort: bool = True) -> pd.DataFrame:
         """타입/정밀도 차이를 흡수하도록 DF 정규화."""
-        df2 = df.copy()
-
-        # 1) 컬럼명 통일
-        df2.columns = [str(c).strip().lower() for c in df2.columns]
+        # 1) 컬럼명 통일 (set_axis 는 새 프레임을 돌려주고 원본 df 는 건드리지 않음;
+        #    copy-on-write 에서는 데이터 복사 없이 아래 isetitem 으로 바뀌는 컬럼만 새로 할당)
+        df2 = df.set_axis([str(c).strip().lower() for c in df.columns], axis=1)
 
         # 2) Decimal/np.generic/NaN → python 스칼라/None (+ float 반올림)
         def _cell(v: Any) -> Any:
@@ -66,22 +121,61 @@ class ExecutionAccuracyMetric(BaseMetric):
                 v = round(v, 6)  # 정밀도 차이 흡수
             return v
 
-        # pandas 2.1+ : DataFrame.map, 그 외 버전은 applymap 폴백
-        if hasattr(pd.DataFrame, "map"):
-            df2 = df2.map(_cell)  # type: ignore[attr-defined]
-        else:  # pragma: no cover  (구버전 호환)
-            df2 = df2.applymap(_cell)  # deprecated path
+        # 컬럼 dtype 별로 처리: 셀 단위 파이썬 호출은 object 등 나머지 컬럼에만
+        for i in range(df2.shape[1]):
+            s = df2.iloc[:, i]
+            kind = s.dtype.kind if isinstance(s.dtype, np.dtype) else None
+            if kind == "b":
+                continue  # 불리언: _cell 결과가 원본과 동일
+            if kind == "i" or (kind == "u" and s.dtype.itemsize < 8):
+                s = s.astype(np.int64)  # python int 로 바꿨을 때 추론되는 dtype 과 동일
+            elif kind == "f":
+                # NaN 은 그대로 (3)에서 처리, + 0.0 으로 -0.0 → 0.0 (fingerprint 비트 일치)
+                s = s.astype(np.float64).round(6) + 0.0
+            else:
+                # object/datetime/extension: object 로 바꿔 map 해야 결과 dtype 이 값 기준으로 재추론됨
+                s = s.astype(object).map(_cell)
+            df2.isetitem(i, s)
 
         # 3) NULL 동일시
         if self.null_equal:
             df2 = df2.fillna("__NULL__")
 
         # 4) 정렬 무시 옵션
-        if self.ignore_order and len(df2.columns):
-            df2 = df2.sort_values(by=list(df2.columns)).reset_index(drop=True)
+        if sort:
+            df2 = self._sort_df(df2)
 
         return df2
 
+    def _sort_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.ignore_order and len(df.columns):
+            df = df.sort_values(by=list(df.columns), kind="stable", ignore_index=True)
+        return df
+
+    def _fingerprint(self, df: pd.DataFrame) -> Any:
+        """equals 전에 싸게 '확실히 다름'을 가려내기 위한 요약값: 컬럼/dtype + 행 해시(순서 무시면 정렬).
+
+        object 컬럼이 있으면 None (비교 생략): 해시가 str 기반이라 1 과 1.0 처럼 == 로 같은 값이
+        다르게 나오고, 혼합 타입은 정렬에서 예외가 나 행 비교 폴백으로 가야 하기 때문.
+        """
+        if any(t == object for t in df.dtypes):
+            return None
+        head = (tuple(df.columns), tuple(str(t) for t in df.dtypes), len(df))
+        if not len(df.columns) or not len(df):
+            return head
+        try:
+            h = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        except Exception:
+            return None
+        if self.ignore_order:
+            h = np.sort(h)
+        return head + (h.tobytes(),)
+
+    def _prep_df(self, df: pd.DataFrame) -> Tuple[Tuple[int, int], Any, "_Once"]:
+        """(shape, fingerprint, 정렬된 정규화 DF). 정렬은 fingerprint 가 같을 때만 필요하므로 지연."""
+        norm = self._norm_df(df, sort=False)
+        return df.shape, self._fingerprint(norm), _Once(lambda: self._sort_df(norm))
+
     def _fetch_df(self, sql: str) -> pd.DataFrame:
         """백엔드로부터 DataFrame 획득. fetch_df가 없으면 exec/execute 폴백."""
         if hasattr(self.backend, "fetch_df"):
@@ -99,30 +193,27 @@ class ExecutionAccuracyMetric(BaseMetric):
 
     def _canon_rows(self, rows: Iterable[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
         """행(tuple) 리스트를 타입/정밀도 제거 후 정렬하여 반환."""
-        import math
-
+        plain = _PLAIN_TYPES
         out: List[Tuple[Any, ...]] = []
+        append = out.append
         for r in rows:
-            rr: List[Any] = []
+            # 대부분의 행은 str/int/None 뿐 → 셀 단위 변환 없이 그대로 사용
             for v in r:
-                if v is None:
-                    rr.append(None)
-                    continue
-                if isinstance(v, float) and math.isnan(v):
-                    rr.append(None)
-                    continue
-                if isinstance(v, np.generic):
-                    v = v.item()
-                if isinstance(v, Decimal):
-                    v = float(v)
-                if isinstance(v, float):
-                    v = round(v, 6)
-                rr.append(v)
-            out.append(tuple(rr))
-        return sorted(out)
+                if type(v) not in plain:
+                    append(tuple([_canon_cell(v) for v in r]))
+                    break
+            else:
+                append(r if type(r) is tuple else tuple(r))
+        try:
+            return sorted(out)
+        except TypeError:
+            # 같은 위치에 None/숫자/문자열이 섞인 경우 → 타입 안전한 키로 정렬
+            return sorted(out, key=_row_sort_key)
 
     def _fetch_rows(self, sql: str) -> List[Tuple[Any, ...]]:
-        """백엔드로부터 행(tuple) 리스트 획득."""
+        """백엔드로부터 행(tuple) 리스트 획득. fetch_rows가 있으면 DataFrame 없이 바로 사용."""
+        if hasattr(self.backend, "fetch_rows"):
+            return list(self.backend.fetch_rows(sql))  # type: ignore[attr-defined]
         if hasattr(self.backend, "exec"):
             return list(self.backend.exec(sql))  # type: ignore[attr-defined]
         if hasattr(self.backend, "execute"):
@@ -133,22 +224,35 @@ class ExecutionAccuracyMetric(BaseMetric):
 
     # ----------------------- 비교 로직 -----------------------
 
-    def _compare_df(self, gold_sql: str, pred_sql: str) -> bool:
+    def _compare_df(self, gold_sql: str, pred: "_Once") -> bool:
         g = self._fetch_df(gold_sql)
-        p = self._fetch_df(pred_sql)
-        return self._norm_df(g).equals(self._norm_df(p))
-
-    def _compare_rows(self, gold_sql: str, pred_sql: str) -> bool:
+        p_shape, p_fp, p_sorted = pred()
+        if g.shape != p_shape:
+            return False  # 행/컬럼 수가 다르면 정규화 없이 불일치 (행 비교로 가도 결과 동일)
+        _, g_fp, g_sorted = self._prep_df(g)
+        if g_fp is not None and p_fp is not None and g_fp != p_fp:
+            return False  # 요약값이 다르면 정렬/equals 없이 불일치
+        return g_sorted().equals(p_sorted())
+
+    def _compare_rows(self, gold_sql: str, pred: "_Once") -> bool:
         grows = self._fetch_rows(gold_sql)
-        prows = self._fetch_rows(pred_sql)
-        return self._canon_rows(grows) == self._canon_rows(prows)
-
-    def _compare(self, gold_sql: str, pred_sql: str) -> bool:
+        prows = pred()
+        if len(grows) != len(prows):
+            return False
+        return self._canon_rows(grows) == prows
+
+    def _compare(self, gold_sql: str, pred_df: "_Once", pred_rows: "_Once") -> bool:
+        if self.ignore_order and not hasattr(self.backend, "fetch_df"):
+            # 1차: 행 비교(항상 정렬하므로 순서 무시일 때만), 실패 시 2차: DF 비교
+            try:
+                return self._compare_rows(gold_sql, pred_rows)
+            except Exception:
+                return self._compare_df(gold_sql, pred_df)
         # 1차: DF 비교, 실패 시 2차: 행 비교
         try:
-            return self._compare_df(gold_sql, pred_sql)
+            return self._compare_df(gold_sql, pred_df)
         except Exception:
-            return self._compare_rows(gold_sql, pred_sql)
+            return self._compare_rows(gold_sql, pred_rows)
 
     # --------------------- BaseMetric 구현 ---------------------
 
@@ -169,9 +273,12 @@ class ExecutionAccuracyMetric(BaseMetric):
             candidates = (
                 [self.gold_sql] if isinstance(self.gold_sql, str) else list(self.gold_sql)
             )
+            # pred 결과는 후보와 무관: 후보마다 다시 실행하지 않고 처음 필요할 때 한 번만 fetch+정규화
+            pred_df = _Once(lambda: self._prep_df(self._fetch_df(pred_sql)))
+            pred_rows = _Once(lambda: self._canon_rows(self._fetch_rows(pred_sql)))
             for cand in candidates:
                 try:
-                    if self._compare(cand, pred_sql):
+                    if self._compare(cand, pred_df, pred_rows):
                         self.score, self.reason = 1.0, "match(candidate)"
                         return self.score
                 except Exception:
@@ -10,7 +10,15 @@ except Exception:
             self.input = input
             self.actual_output = actual_output or output
 
-import sqlglot
+from functools import lru_cache
+
+from ._sqlglot import literal_key, transpile
+
+@lru_cache(maxsize=4096)
+def _normalize_sql(sql: str, dialect: str | None) -> str:
+    """transpile 결과를 (sql, dialect) 기준으로 memoize (같은 gold SQL 이 케이스마다 반복됨)"""
+    # robust normalization via transpile (Expression.to_sql 아님!)
+    return transpile(sql, dialect, pretty=False, normalize=True)[0]
 
 class SQLSemanticMatchMetric(BaseMetric):
     def __init__(self, gold_sql, dialect: str | None = None):
@@ -23,19 +31,29 @@ class SQLSemanticMatchMetric(BaseMetric):
         self.async_mode = False
         self.score = None
         self.reason = None
+        self._gold_keys = set()  # 정규화되는 후보만: 파싱 못 한 gold 와 글자가 같다고 만점을 주지 않음
+        for cand in ([gold_sql] if isinstance(gold_sql, str) else list(gold_sql)):
+            try:
+                self._normalize(cand)
+            except Exception:
+                continue
+            self._gold_keys.add(literal_key(cand))
 
     def _normalize(self, sql: str) -> str:
         sql = (sql or "").strip()
         if not sql:
             return ""
-        # robust normalization via transpile (Expression.to_sql 아님!)
-        read = self.dialect
-        write = self.dialect
-        return sqlglot.transpile(sql, read=read, write=write, pretty=False, normalize=True)[0]
+        return _normalize_sql(sql, self.dialect)
 
     def measure(self, test_case: LLMTestCase) -> float:
+        pred = getattr(test_case, "actual_output", None) or getattr(test_case, "output", "")
+        # 텍스트가 gold 와 그대로 같으면 transpile 없이 통과
+        pred_key = literal_key(pred)
+        if pred_key and pred_key in self._gold_keys:
+            self.score, self.reason = 1.0, "literal-equal"
+            return self.score
         try:
-            pred_norm = self._normalize(getattr(test_case, "actual_output", None) or getattr(test_case, "output", ""))
+            pred_norm = self._normalize(pred)
             candidates = [self.gold_sql] if isinstance(self.gold_sql, str) else list(self.gold_sql)
             best = 0.0
             for cand in candidates:
@@ -1,8 +1,18 @@
-import json, os
+import os
+from contextlib import ExitStack
+from types import SimpleNamespace
 
-def load_json(path: str):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+from .jsonio import load_json
+
+def iter_json_array(path: str):
+    """최상위 JSON 배열의 원소를 순서대로 yield. ijson 이 있으면 파일 전체를 메모리에 올리지 않고 스트리밍."""
+    try:
+        import ijson
+    except ImportError:
+        yield from load_json(path)
+        return
+    with open(path, "rb") as f:
+        yield from ijson.items(f, "item", use_float=True)
 
 def build_backend():
     backend = os.getenv("BACKEND", "sqlalchemy").lower()
@@ -26,60 +36,102 @@ def build_backend():
     else:
         raise ValueError(f"Unknown BACKEND={backend}")
 
+def _metric_entry(m) -> dict:
+    return {
+        "name": getattr(m, "name", type(m).__name__),
+        "score": getattr(m, "score", None),
+        "threshold": getattr(m, "threshold", 1.0),
+        "reason": getattr(m, "reason", None),
+    }
+
+def _measure_all(metrics, case):
+    # 모든 메트릭 동기 강제 + 직접 측정
+    for m in metrics:
+        try: m.async_mode = False
+        except Exception: pass
+        m.measure(case)
+    return [_metric_entry(m) for m in metrics]
+
+def _parsing_metrics(job):
+    """SemanticMatch + ComponentMatch (sqlglot, 순수 CPU) -- 워커 프로세스에서도 실행 가능하도록 모듈 레벨."""
+    from .metrics.sql_semantic_match import SQLSemanticMatchMetric
+    from .metrics.component_match import ComponentMatchMetric
+    gold_sql, pred_sql, dialect, weights = job
+    return _measure_all(
+        [
+            SQLSemanticMatchMetric(gold_sql, dialect=dialect),
+            ComponentMatchMetric(gold_sql, dialect=dialect, weights=weights),
+        ],
+        SimpleNamespace(input="", actual_output=pred_sql),
+    )
+
 def run_eval(testcases_path: str, predictions_path: str, dialect: str | None = None, component_weights: dict | None = None):
     # DeepEval import은 'BaseMetric' 타입 호환 위해서만 남겨둠 (실행은 수동으로)
     from deepeval.test_case import LLMTestCase
     from .metrics.executable_sql import ExecutableSQLMetric
     from .metrics.execution_accuracy import ExecutionAccuracyMetric
-    from .metrics.sql_semantic_match import SQLSemanticMatchMetric
-    from .metrics.component_match import ComponentMatchMetric
 
-    tcs = load_json(testcases_path)
-    preds_list = load_json(predictions_path)
-    preds = {p["id"]: p["pred_sql"] for p in preds_list}
+    preds = {p["id"]: p["pred_sql"] for p in iter_json_array(predictions_path)}
 
     backend = build_backend()
 
+    # testcases 는 스트리밍으로 한 건씩 (직렬 경로에서는 전체 목록을 메모리에 두지 않음)
+    cases = ((tc, (preds.get(tc["id"], "") or "").strip()) for tc in iter_json_array(testcases_path))
+
+    # TSQL_EVAL_WORKERS > 1 이면 파싱 메트릭을 프로세스 풀에서 미리 돌리고(GIL 회피),
+    # 그동안 메인 스레드는 DB 를 타는 실행 메트릭을 순서대로 처리한다. 기본값은 직렬.
+    workers = int(os.getenv("TSQL_EVAL_WORKERS", "0") or 0)
+    # TSQL_EVAL_EXEC_CHECK=explain 이면 실행 가능 여부를 EXPLAIN 으로만 판정 (기본: 실제 실행)
+    check_mode = os.getenv("TSQL_EVAL_EXEC_CHECK", "execute").lower()
+    explain_cache: dict = {}  # 이번 실행 동안만 공유 (SQL → EXPLAIN 결과)
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        cases = list(cases)  # pool.map 은 입력을 한 번에 제출하므로 어차피 전부 필요
+        pool = ProcessPoolExecutor(max_workers=workers)
+        parsed = pool.map(
+            _parsing_metrics,
+            [(tc["gold_sql"], pred_sql, dialect, component_weights) for tc, pred_sql in cases],
+            chunksize=max(1, len(cases) // (workers * 4)),
+        )
+
     all_results = []
     success_all = 0
 
-    for tc in tcs:
-        qid = tc["id"]; question = tc["question"]; gold_sql = tc["gold_sql"]
-        pred_sql = (preds.get(qid, "") or "").strip()
-        case = LLMTestCase(input=question, actual_output=pred_sql)
+    # 백엔드가 지원하면 루프 동안 DB 커넥션 하나를 고정 (케이스마다 풀 checkout 반복 제거)
+    session = ExitStack()
+    if hasattr(backend, "close"):
+        session.callback(backend.close)  # 여기서 만든 백엔드: 루프가 끝나면 커넥션/풀 정리
+    if hasattr(backend, "session"):
+        session.enter_context(backend.session())
 
-        metrics = [
-            ExecutableSQLMetric(backend),
-            ExecutionAccuracyMetric(backend, gold_sql),
-            SQLSemanticMatchMetric(gold_sql, dialect=dialect),
-            ComponentMatchMetric(gold_sql, dialect=dialect, weights=component_weights),
-        ]
-        # 모든 메트릭 동기 강제 + 직접 측정
-        for m in metrics:
-            try: m.async_mode = False
-            except Exception: pass
-            m.measure(case)
-
-        out = {"id": qid, "question": question, "gold_sql": gold_sql, "pred_sql": pred_sql, "metrics": []}
-        pass_map = {}
-        for m in metrics:
-            name = getattr(m, "name", type(m).__name__)
-            score = getattr(m, "score", None)
-            thr = getattr(m, "threshold", 1.0)
-            reason = getattr(m, "reason", None)
-            ok = (score is not None and score >= thr)
-            pass_map[name] = ok
-            out["metrics"].append({"name": name, "score": score, "threshold": thr, "reason": reason})
-
-        # 합격 기준:
-        # 1) 실행 가능 + 실행 일치 = 필수
-        # 2) (선택) 나머지 2개는 참고용이므로 전체 판정에서 필수 아님
-        must_ok = pass_map.get("executable_sql", False) and pass_map.get("execution_accuracy", False)
-        out["passed_all"] = bool(must_ok)
-        if out["passed_all"]:
-            success_all += 1
-
-        all_results.append(out)
+    try:
+        for tc, pred_sql in cases:
+            if pool is not None:
+                parse_entries = next(parsed)
+            else:
+                parse_entries = _parsing_metrics((tc["gold_sql"], pred_sql, dialect, component_weights))
+            qid = tc["id"]; question = tc["question"]; gold_sql = tc["gold_sql"]
+            case = LLMTestCase(input=question, actual_output=pred_sql)
+
+            exec_entries = _measure_all([ExecutableSQLMetric(backend, check_mode, explain_cache), ExecutionAccuracyMetric(backend, gold_sql)], case)
+            out = {"id": qid, "question": question, "gold_sql": gold_sql, "pred_sql": pred_sql,
+                   "metrics": exec_entries + parse_entries}
+            pass_map = {e["name"]: (e["score"] is not None and e["score"] >= e["threshold"]) for e in out["metrics"]}
+
+            # 합격 기준:
+            # 1) 실행 가능 + 실행 일치 = 필수
+            # 2) (선택) 나머지 2개는 참고용이므로 전체 판정에서 필수 아님
+            must_ok = pass_map.get("executable_sql", False) and pass_map.get("execution_accuracy", False)
+            out["passed_all"] = bool(must_ok)
+            if out["passed_all"]:
+                success_all += 1
+
+            all_results.append(out)
+    finally:
+        session.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
 
     summary = {"passed_all": success_all, "total": len(all_results)}
     print(f"Done. {summary['passed_all']}/{summary['total']} passed (required metrics).")
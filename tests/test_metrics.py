@@ -1,4 +1,5 @@
 import os, json
+import pytest
 from tsql_eval.backends.sqlalchemy_backend import SQLAlchemyBackend
 from tsql_eval.metrics.executable_sql import ExecutableSQLMetric
 from tsql_eval.metrics.execution_accuracy import ExecutionAccuracyMetric
@@ -20,3 +21,57 @@ def test_metrics_smoke():
         assert 0.0 <= ExecutionAccuracyMetric(backend, tc["gold_sql"]).measure(dummy) <= 1.0
         assert 0.0 <= SQLSemanticMatchMetric(tc["gold_sql"], dialect="spark").measure(dummy) <= 1.0
         assert 0.0 <= ComponentMatchMetric(tc["gold_sql"], dialect="spark").measure(dummy) <= 1.0
+
+def test_component_match_deep_union():
+    # 깊은 UNION 체인도 재귀 한도 없이 순회되어야 함 (마지막 분기만 달라 literal-equal 지름길을 타지 않음)
+    gold = " UNION ALL ".join(["SELECT x FROM t"] * 1000)
+    dummy = type("Case",(),{})(); dummy.output = " UNION ALL ".join(["SELECT x FROM t"] * 999 + ["SELECT 1 FROM t"])
+    m = ComponentMatchMetric(gold)
+    assert m.measure(dummy) == 1.0
+    assert m.reason != "literal-equal"
+
+def test_unparsable_identical_gold_scores_zero():
+    # 파싱 안 되는 gold 는 pred 와 글자가 같아도 literal-equal 지름길로 만점이 되면 안 됨
+    sql = "SELEC FROM WHERE ((("
+    dummy = type("Case",(),{})(); dummy.output = sql
+    assert SQLSemanticMatchMetric(sql).measure(dummy) == 0.0
+    assert ComponentMatchMetric(sql).measure(dummy) == 0.0
+
+def test_canon_rows_mixed_none():
+    # 같은 위치에 None 과 숫자가 섞여도 정렬되고, 입력 순서와 무관하게 같은 결과
+    m = ExecutionAccuracyMetric(None, "")
+    rows = [(1, None), (None, 2)]
+    assert m._canon_rows(rows) == [(None, 2), (1, None)]
+    assert m._canon_rows(rows[::-1]) == m._canon_rows(rows)
+
+def test_duckdb_timestamp_list_is_hashable():
+    # TIMESTAMP[] 는 스칼라 TIMESTAMP 와 달리 list 로 나오므로 정규화(→str) 대상이어야 함
+    backend = SQLAlchemyBackend("duckdb:///:memory:")
+    sql = "SELECT [TIMESTAMP '2020-01-01 00:00:00', TIMESTAMP '2020-01-02 00:00:00'] AS ts, TIMESTAMP '2020-01-01' AS t"
+    rows = backend.execute(sql)
+    hash(rows[0])
+    dummy = type("Case",(),{})(); dummy.output = sql
+    assert ExecutionAccuracyMetric(backend, sql).measure(dummy) == 1.0
+
+def test_execution_accuracy_respects_row_order():
+    # ignore_order=False 면 행 순서가 다를 때 불일치여야 함 (fetch_df 없는 기본 백엔드 포함)
+    backend = SQLAlchemyBackend("sqlite:///./data/sample.db")
+    gold = "SELECT 1 AS x UNION ALL SELECT 2"
+    dummy = type("Case",(),{})(); dummy.output = "SELECT 2 AS x UNION ALL SELECT 1"
+    assert ExecutionAccuracyMetric(backend, gold, ignore_order=False).measure(dummy) == 0.0
+    assert ExecutionAccuracyMetric(backend, gold, ignore_order=True).measure(dummy) == 1.0
+    dummy.output = gold
+    assert ExecutionAccuracyMetric(backend, gold, ignore_order=False).measure(dummy) == 1.0
+
+def test_duckdb_statements_do_not_leak_state():
+    # 커넥션을 재사용해도 한 예측의 임시 테이블/실패한 트랜잭션이 다음 예측에 남지 않아야 함
+    backend = SQLAlchemyBackend("duckdb:///:memory:")
+    try:
+        backend.execute("CREATE TEMP TABLE leaked AS SELECT 1 AS x")
+        with pytest.raises(Exception):
+            backend.execute("SELECT * FROM leaked")
+        with pytest.raises(Exception):
+            backend.execute("SELECT * FROM missing_table")
+        assert backend.execute("SELECT 1") == [(1,)]
+    finally:
+        backend.close()
@@ -6,18 +6,30 @@ DuckDB (NYC Taxi)용 Ollama 기반 Text-to-SQL 예측 스크립트
 - 흔한 패턴/오타를 후처리로 자동 교정(apply_sql_fixes)
 - 결과를 predictions/nyc_duckdb_preds.json 로 저장
   -> make nyc-predict-ollama-duck 에서 이 파일을 사용
+- 같은 (모델, 프롬프트) 응답은 --cache(SQLite 파일)에 저장해 재실행 시 LLM 호출 생략
+  (--semantic-threshold 를 주면 임베딩 코사인 유사도로 비슷한 질문도 캐시 적중 처리)
+- 케이스들은 최대 --parallel(기본: OLLAMA_NUM_PARALLEL, 없으면 4)개씩 동시에 요청
+  (서버 쪽도 OLLAMA_NUM_PARALLEL 이상으로 띄워야 실제로 병렬 처리됨;
+   여러 모델을 번갈아 쓰면 OLLAMA_MAX_LOADED_MODELS 도 함께 조정)
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
 import re
+import sqlite3
 import sys
-from typing import Any, Dict, List
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 
 
 # ========= DuckDB 전용 스키마/규칙 힌트 =========
@@ -88,108 +100,186 @@ STRICT OUTPUT RULES (very important):
     ORDER BY 3 DESC
 """
 
-def apply_sql_fixes(sql: str, question: str | None = None) -> str:
-    import re
+# ========= apply_sql_fixes 패턴 (모듈 로드 시 한 번만 컴파일) =========
+_I = re.IGNORECASE
+_RE_WS = re.compile(r"\s+")
+_RE_FROM_TRIPS = re.compile(r"\bFROM\s+trips_small\b", _I)
+
+# q1: pickup_ntaname count top-k
+_RE_Q1_SELECT = re.compile(r"SELECT\s+pickup_ntaname\s+AS\s+cnt\s*,\s*COUNT\(\s*\*\s*\)", _I)
+_RE_Q1_GROUP = re.compile(r"GROUP\s+BY\s+pickup_ntaname\b", _I)
+_RE_Q1_COUNT = re.compile(r"COUNT\(\s*\*\s*\)(?!\s+AS\s+cnt)", _I)
+_RE_Q1_ORDER_COUNT = re.compile(r"ORDER\s+BY\s+COUNT\(\s*\*\s*\)\s+DESC", _I)
+_RE_Q1_ORDER_CNT = re.compile(r"ORDER\s+BY\s+cnt\s+DESC", _I)
+
+# q2: passenger_count별 AVG(total_amount)
+_RE_Q2_EMPTY_CMP = re.compile(r"\bpassenger_count\s*<>\s*''\s*(AND\s*)?", _I)
+_RE_Q2_AND_GROUP = re.compile(r"\bAND\s+GROUP\s+BY\b", _I)
+_RE_Q2_GROUP = re.compile(r"\bGROUP\s+BY\s+passenger_count\b", _I)
+_RE_Q2_SELECTS_COL = re.compile(r"SELECT\s+.*\bpassenger_count\b", _I)
+_RE_SELECT = re.compile(r"SELECT\s+", _I)
+_RE_Q2_AVG = re.compile(r"AVG\s*\(\s*total_amount\s*\)\s*(AS\s+\w+)?", _I)
+_RE_ORDER_N_DESC = re.compile(r"ORDER\s+BY\s+\d+\s+DESC", _I)
+_RE_ORDER_AVG_TOTAL = re.compile(r"ORDER\s+BY\s+avg_total", _I)
+_RE_ORDER_BY = re.compile(r"ORDER\s+BY", _I)
+
+# q3: 2015년 1~3월 필터
+_RE_Q3_YEAR = re.compile(r"EXTRACT\s*\(\s*YEAR\s+FROM\s+pickup_datetime\s*\)\s*=\s*2015", _I)
+_RE_Q3_MONTH = re.compile(r"EXTRACT\s*\(\s*MONTH\s+FROM\s+pickup_datetime\s*\)\s*(IN|BETWEEN)", _I)
+_RE_Q3_WHERE_YEAR = re.compile(r"(WHERE\s+EXTRACT\s*\(\s*YEAR\s+FROM\s+pickup_datetime\s*\)\s*=\s*2015)", _I)
+_RE_Q3_SUM = re.compile(r"SUM\s*\(\s*trip_distance\s*\)\s+AS\s+\w+", _I)
+_RE_GROUP_N = re.compile(r"GROUP\s+BY\s+\d+", _I)
+_RE_ORDER_N = re.compile(r"ORDER\s+BY\s+\d+", _I)
+
+# q4: tip_ratio top-20
+_RE_Q4_RATIO = re.compile(r"tip_amount\s*/\s*NULLIF\s*\(\s*total_amount\s*,\s*0\s*\)\s+AS\s+\w+", _I)
+_RE_Q4_WHERE_TOTAL = re.compile(r"WHERE\s+.*total_amount\s*>\s*0", _I)
+_RE_Q4_NTA_FILTERS = (
+    re.compile(r"\s+AND\s+pickup_ntaname\s+IS\s+NOT\s+NULL", _I),
+    re.compile(r"\s+AND\s+pickup_ntaname\s*<>\s*''", _I),
+    re.compile(r"\s+AND\s+dropoff_ntaname\s+IS\s+NOT\s+NULL", _I),
+    re.compile(r"\s+AND\s+dropoff_ntaname\s*<>\s*''", _I),
+)
+
+# q5: payment_type별 avg + count
+_RE_FROM_NYC_TRIPS = re.compile(r"\bFROM\s+nyc\.trips_small\b", _I)
+_RE_Q5_GROUP = re.compile(r"\bGROUP\s+BY\s+1\b|\bGROUP\s+BY\s+payment_type\b", _I)
+_RE_Q5_ALIAS_CNT = re.compile(r"\bpayment_type\s+AS\s+cnt\b", _I)
+_RE_Q5_HAS_AVG = re.compile(r"AVG\s*\(\s*total_amount\s*\)\s+AS\s+avg_total", _I)
+_RE_Q5_SELECT = re.compile(r"SELECT\s+payment_type", _I)
+_RE_Q5_HAS_COUNT = re.compile(r"COUNT\s*\(\s*\*\s*\)\s+AS\s+cnt", _I)
+_RE_Q5_AVG_ALIAS = re.compile(r"AVG\(total_amount\)\s+AS\s+avg_total", _I)
+_RE_Q5_ORDER_TAIL = re.compile(r"ORDER\s+BY\s+.*?;", _I)
+
+_JAN_TO_MAR = ("1~3월", "1-3월", "1 ~ 3월", "jan–mar", "jan-mar", "1 to 3")
+
+
+def _normalize_sql_text(sql: str | None) -> str:
+    """백틱/줄바꿈/연속 공백 정리 + 끝 세미콜론 보장."""
     s = (sql or "").strip().strip("`").strip()
     s = s.replace("\n", " ").replace("\r", " ")
-    s = re.sub(r"\s+", " ", s)
+    s = _RE_WS.sub(" ", s)
 
     # 세미콜론 보장
     if s and not s.endswith(";"):
         s += ";"
+    return s
+
+
+# SCHEMA_HINT 에 적어 둔 정답 형태들(정규화 후). LLM 이 이 형태 그대로 내면 교정 규칙을 돌리지 않음
+_CANONICAL_SQL = frozenset(
+    _normalize_sql_text(m)
+    for m in re.findall(r"^ {4}(SELECT\b.*?)(?=\n\s*\n|\n  \*|\Z)", SCHEMA_HINT, re.S | re.M)
+)
+
+
+def apply_sql_fixes(sql: str, question: str | None = None) -> str:
+    s = _normalize_sql_text(sql)
+    if s in _CANONICAL_SQL:
+        return s
+
+    # 규칙마다 기준 단어가 없으면 정규식 자체를 건너뜀 (앞 규칙이 새로 만들 수 없는 단어만 사용).
+    # 비ASCII 가 섞이면 IGNORECASE 매칭과 lower() 가 어긋날 수 있어 게이트 없이 전부 적용
+    low = s.lower() if s.isascii() else None
+
+    def has(word: str) -> bool:
+        return low is None or word in low
 
     # DuckDB: 테이블 접두사 일치
-    s = re.sub(r"\bFROM\s+trips_small\b", "FROM nyc.trips_small", s, flags=re.IGNORECASE)
+    if has("trips_small"):
+        s = _RE_FROM_TRIPS.sub("FROM nyc.trips_small", s)
 
     # ---------------- q1: pickup_ntaname count top-k ----------------
-    s = re.sub(
-        r"SELECT\s+pickup_ntaname\s+AS\s+cnt\s*,\s*COUNT\(\s*\*\s*\)",
-        "SELECT pickup_ntaname, COUNT(*) AS cnt",
-        s,
-        flags=re.IGNORECASE,
-    )
-    if re.search(r"GROUP\s+BY\s+pickup_ntaname\b", s, re.IGNORECASE):
-        s = re.sub(r"COUNT\(\s*\*\s*\)(?!\s+AS\s+cnt)", "COUNT(*) AS cnt", s, flags=re.IGNORECASE)
-        s = re.sub(r"ORDER\s+BY\s+COUNT\(\s*\*\s*\)\s+DESC", "ORDER BY cnt DESC", s, flags=re.IGNORECASE)
+    if has("pickup_ntaname"):
+        s = _RE_Q1_SELECT.sub("SELECT pickup_ntaname, COUNT(*) AS cnt", s)
+    if has("pickup_ntaname") and _RE_Q1_GROUP.search(s):
+        s = _RE_Q1_COUNT.sub("COUNT(*) AS cnt", s)
+        s = _RE_Q1_ORDER_COUNT.sub("ORDER BY cnt DESC", s)
         # GROUP BY 1 형태로 단순화
-        s = re.sub(r"GROUP\s+BY\s+pickup_ntaname\b", "GROUP BY 1", s, flags=re.IGNORECASE)
-        s = re.sub(r"ORDER\s+BY\s+cnt\s+DESC", "ORDER BY 2 DESC", s, flags=re.IGNORECASE)
+        s = _RE_Q1_GROUP.sub("GROUP BY 1", s)
+        s = _RE_Q1_ORDER_CNT.sub("ORDER BY 2 DESC", s)
 
     # ---------------- q2: passenger_count별 AVG(total_amount) -------
     # '' 비교 제거 → 고아 AND 제거
-    s = re.sub(r"\bpassenger_count\s*<>\s*''\s*(AND\s*)?", "", s, flags=re.IGNORECASE)
-    s = re.sub(r"\bAND\s+GROUP\s+BY\b", " GROUP BY ", s, flags=re.IGNORECASE)  # ... AND GROUP BY ...
+    if has("passenger_count"):
+        s = _RE_Q2_EMPTY_CMP.sub("", s)
+    if has("group"):
+        s = _RE_Q2_AND_GROUP.sub(" GROUP BY ", s)  # ... AND GROUP BY ...
     s = s.replace("WHERE AND ", "WHERE ")  # WHERE AND ...
 
     # SELECT 컬럼/별칭/정렬 정규화
-    if re.search(r"\bGROUP\s+BY\s+passenger_count\b", s, re.IGNORECASE):
-        if not re.search(r"SELECT\s+.*\bpassenger_count\b", s, re.IGNORECASE):
-            s = re.sub(r"SELECT\s+", "SELECT passenger_count, ", s, count=1, flags=re.IGNORECASE)
-        s = re.sub(r"AVG\s*\(\s*total_amount\s*\)\s*(AS\s+\w+)?", "AVG(total_amount) AS avg_total", s, flags=re.IGNORECASE)
+    if has("passenger_count") and _RE_Q2_GROUP.search(s):
+        if not _RE_Q2_SELECTS_COL.search(s):
+            s = _RE_SELECT.sub("SELECT passenger_count, ", s, count=1)
+        s = _RE_Q2_AVG.sub("AVG(total_amount) AS avg_total", s)
         # 정렬 보정
-        if re.search(r"ORDER\s+BY\s+\d+\s+DESC", s, re.IGNORECASE) and not re.search(r"ORDER\s+BY\s+avg_total", s, re.IGNORECASE):
-            s = re.sub(r"ORDER\s+BY\s+\d+\s+DESC", "ORDER BY avg_total DESC", s, flags=re.IGNORECASE)
-        elif not re.search(r"ORDER\s+BY", s, re.IGNORECASE):
+        if _RE_ORDER_N_DESC.search(s) and not _RE_ORDER_AVG_TOTAL.search(s):
+            s = _RE_ORDER_N_DESC.sub("ORDER BY avg_total DESC", s)
+        elif not _RE_ORDER_BY.search(s):
             s = s[:-1] + " ORDER BY avg_total DESC;"
 
     # ---------------- q3: 2015년 1~3월 필터 ------------------------
     qtxt = (question or "").lower()
-    wants_jan_to_mar = any(p in qtxt for p in ["1~3월", "1-3월", "1 ~ 3월", "jan–mar", "jan-mar", "1 to 3"])
-    if re.search(r"EXTRACT\s*\(\s*YEAR\s+FROM\s+pickup_datetime\s*\)\s*=\s*2015", s, re.IGNORECASE):
-        has_month = re.search(r"EXTRACT\s*\(\s*MONTH\s+FROM\s+pickup_datetime\s*\)\s*(IN|BETWEEN)", s, re.IGNORECASE)
+    wants_jan_to_mar = any(p in qtxt for p in _JAN_TO_MAR)
+    if has("2015") and _RE_Q3_YEAR.search(s):
+        has_month = _RE_Q3_MONTH.search(s)
         if wants_jan_to_mar and not has_month:
-            s = re.sub(
-                r"(WHERE\s+EXTRACT\s*\(\s*YEAR\s+FROM\s+pickup_datetime\s*\)\s*=\s*2015)",
-                r"\1 AND EXTRACT(MONTH FROM pickup_datetime) IN (1,2,3)",
-                s,
-                flags=re.IGNORECASE,
-            )
-        s = re.sub(r"SUM\s*\(\s*trip_distance\s*\)\s+AS\s+\w+", "SUM(trip_distance) AS dist", s, flags=re.IGNORECASE)
-        s = re.sub(r"GROUP\s+BY\s+\d+", "GROUP BY 1", s, flags=re.IGNORECASE)
-        s = re.sub(r"ORDER\s+BY\s+\d+", "ORDER BY 1", s, flags=re.IGNORECASE)
+            s = _RE_Q3_WHERE_YEAR.sub(r"\1 AND EXTRACT(MONTH FROM pickup_datetime) IN (1,2,3)", s)
+        s = _RE_Q3_SUM.sub("SUM(trip_distance) AS dist", s)
+        s = _RE_GROUP_N.sub("GROUP BY 1", s)
+        s = _RE_ORDER_N.sub("ORDER BY 1", s)
 
     # ---------------- q4: tip_ratio top-20 --------------------------
-    if re.search(r"tip_amount\s*/\s*NULLIF\s*\(\s*total_amount\s*,\s*0\s*\)\s+AS\s+\w+", s, re.IGNORECASE):
-        s = re.sub(
-            r"tip_amount\s*/\s*NULLIF\s*\(\s*total_amount\s*,\s*0\s*\)\s+AS\s+\w+",
-            "tip_amount/NULLIF(total_amount,0) AS tip_ratio",
-            s,
-            flags=re.IGNORECASE,
-        )
+    if has("nullif") and _RE_Q4_RATIO.search(s):
+        s = _RE_Q4_RATIO.sub("tip_amount/NULLIF(total_amount,0) AS tip_ratio", s)
         # 불필요한 ntaname 필터 제거
-        if re.search(r"WHERE\s+.*total_amount\s*>\s*0", s, re.IGNORECASE):
-            s = re.sub(r"\s+AND\s+pickup_ntaname\s+IS\s+NOT\s+NULL", "", s, flags=re.IGNORECASE)
-            s = re.sub(r"\s+AND\s+pickup_ntaname\s*<>\s*''", "", s, flags=re.IGNORECASE)
-            s = re.sub(r"\s+AND\s+dropoff_ntaname\s+IS\s+NOT\s+NULL", "", s, flags=re.IGNORECASE)
-            s = re.sub(r"\s+AND\s+dropoff_ntaname\s*<>\s*''", "", s, flags=re.IGNORECASE)
+        if _RE_Q4_WHERE_TOTAL.search(s):
+            for pat in _RE_Q4_NTA_FILTERS:
+                s = pat.sub("", s)
 
     # ---------------- q5: payment_type별 avg + count, 정렬 ----------
-    if re.search(r"\bFROM\s+nyc\.trips_small\b", s, re.IGNORECASE) and re.search(r"\bGROUP\s+BY\s+1\b|\bGROUP\s+BY\s+payment_type\b", s, re.IGNORECASE):
-        s = re.sub(r"\bpayment_type\s+AS\s+cnt\b", "payment_type", s, flags=re.IGNORECASE)
+    if has("group") and _RE_FROM_NYC_TRIPS.search(s) and _RE_Q5_GROUP.search(s):
+        s = _RE_Q5_ALIAS_CNT.sub("payment_type", s)
         # AVG/COUNT 컬럼 보장
-        if not re.search(r"AVG\s*\(\s*total_amount\s*\)\s+AS\s+avg_total", s, re.IGNORECASE):
-            s = re.sub(r"SELECT\s+payment_type", "SELECT payment_type, AVG(total_amount) AS avg_total", s, flags=re.IGNORECASE)
-        if not re.search(r"COUNT\s*\(\s*\*\s*\)\s+AS\s+cnt", s, re.IGNORECASE):
-            s = re.sub(r"AVG\(total_amount\)\s+AS\s+avg_total", "AVG(total_amount) AS avg_total, COUNT(*) AS cnt", s, flags=re.IGNORECASE)
+        if not _RE_Q5_HAS_AVG.search(s):
+            s = _RE_Q5_SELECT.sub("SELECT payment_type, AVG(total_amount) AS avg_total", s)
+        if not _RE_Q5_HAS_COUNT.search(s):
+            s = _RE_Q5_AVG_ALIAS.sub("AVG(total_amount) AS avg_total, COUNT(*) AS cnt", s)
         # 정렬을 cnt DESC로 강제
-        if re.search(r"ORDER\s+BY", s, re.IGNORECASE):
-            s = re.sub(r"ORDER\s+BY\s+.*?;", "ORDER BY cnt DESC;", s, flags=re.IGNORECASE)
+        if _RE_ORDER_BY.search(s):
+            s = _RE_Q5_ORDER_TAIL.sub("ORDER BY cnt DESC;", s)
         else:
             s = s[:-1] + " ORDER BY cnt DESC;"
 
     return s
 
+# 프롬프트 앞뒤 고정 부분은 한 번만 만들어 둠. 스키마 힌트가 항상 맨 앞이라
+# Ollama 가 요청 사이에 공통 prefix 의 KV 캐시를 그대로 재사용할 수 있다.
+_PROMPT_PREFIX = SCHEMA_HINT + "\n\nQuestion:\n"
+_PROMPT_SUFFIX = "\n\nReturn only the final SQL:"
+
+
 def build_prompt(question: str) -> str:
-    return f"""{SCHEMA_HINT}
+    return _PROMPT_PREFIX + question + _PROMPT_SUFFIX
+
 
-Question:
-{question}
+# 요청마다 새 TCP 연결을 맺지 않도록 keep-alive 세션 하나를 공유 (스레드별 요청도 같은 풀 사용)
+_SESSION = requests.Session()
 
-Return only the final SQL:"""
 
+def _mount_pool(size: int) -> None:
+    """호스트당 최대 size 개의 연결을 유지 (동시 요청 수보다 작으면 남는 연결은 매번 버려짐)."""
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=size)
+    _SESSION.mount("http://", adapter)
+    _SESSION.mount("https://", adapter)
 
-def ollama_generate(model: str, prompt: str, host: str = "http://localhost:11434") -> str:
-    """Ollama 로컬 API 호출 (stream=False)."""
+
+_mount_pool(16)
+
+
+def ollama_generate(model: str, prompt: str, host: str = "http://localhost:11434",
+                    keep_alive: str | None = None) -> str:
+    """Ollama 로컬 API 호출 (stream=False). keep_alive 를 주면 그동안 모델(과 KV 캐시)을 메모리에 유지."""
     url = f"{host}/api/generate"
     payload = {
         "model": model,
@@ -198,12 +288,126 @@ def ollama_generate(model: str, prompt: str, host: str = "http://localhost:11434
         # 보수적으로 결정론 강화
         "options": {"temperature": 0, "top_p": 0.9},
     }
-    r = requests.post(url, json=payload, timeout=300)
+    if keep_alive:
+        payload["keep_alive"] = keep_alive
+    r = _SESSION.post(url, json=payload, timeout=300)
     r.raise_for_status()
     data = r.json()
     return data.get("response", "").strip()
 
 
+def ollama_embed_batch(model: str, texts: List[str], host: str = "http://localhost:11434") -> List[List[float]]:
+    """
+    Ollama /api/embed 에 문장 목록을 한 번에 보내 임베딩 목록을 받는다 (입력 순서 유지).
+    응답에 "embeddings" 가 없는 구버전 서버면 /api/embeddings 로 한 건씩 요청.
+    """
+    r = _SESSION.post(f"{host}/api/embed", json={"model": model, "input": texts}, timeout=60)
+    if r.ok:
+        embs = r.json().get("embeddings")
+        if embs is not None:
+            return embs
+    out = []
+    for t in texts:
+        r = _SESSION.post(f"{host}/api/embeddings", json={"model": model, "prompt": t}, timeout=60)
+        r.raise_for_status()
+        out.append(r.json()["embedding"])
+    return out
+
+
+class _VecIndex:
+    """
+    정규화된 임베딩(float32, 연속 행렬) + 응답 목록. 코사인 유사도 = 행렬 @ 질의 벡터.
+    행렬 용량은 두 배씩 늘려 삽입마다 전체를 복사하지 않음. 차원이 다른 벡터는 검색 대상에서 제외.
+    """
+
+    def __init__(self) -> None:
+        self.mat: Optional[np.ndarray] = None  # (용량, 차원)
+        self.responses: List[str] = []
+
+    def add(self, vec: np.ndarray, response: str) -> None:
+        n = len(self.responses)
+        if self.mat is None:
+            self.mat = np.empty((16, vec.shape[0]), dtype=np.float32)
+        elif self.mat.shape[1] != vec.shape[0]:
+            return
+        elif n == self.mat.shape[0]:
+            grown = np.empty((2 * n, self.mat.shape[1]), dtype=np.float32)
+            grown[:n] = self.mat
+            self.mat = grown
+        self.mat[n] = vec
+        self.responses.append(response)
+
+    def best(self, vec: np.ndarray) -> Tuple[float, Optional[str]]:
+        n = len(self.responses)
+        if not n or self.mat.shape[1] != vec.shape[0]:
+            return float("-inf"), None
+        sims = self.mat[:n] @ vec.astype(np.float32)
+        i = int(np.argmax(sims))
+        return float(sims[i]), self.responses[i]
+
+
+class PromptCache:
+    """
+    (모델, 프롬프트) → LLM 원본 응답 캐시 (SQLite 파일 하나, 스레드 공유).
+    - 정확 일치: sha256(모델 + 프롬프트) 키
+    - 유사 일치(선택): 질문 임베딩을 정규화해 메모리 행렬로 들고, 코사인 유사도 >= threshold 면 그 응답 재사용
+    """
+
+    def __init__(self, path: str, threshold: Optional[float] = None) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS prompts (key TEXT PRIMARY KEY, response TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, embed_model TEXT NOT NULL, vec BLOB NOT NULL, response TEXT NOT NULL);"
+        )
+        # (model, embed_model) → 임베딩 인덱스; 처음 조회할 때 한 번 로드
+        self._vecs: Dict[Tuple[str, str], _VecIndex] = {}
+
+    @staticmethod
+    def _key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT response FROM prompts WHERE key = ?", (self._key(model, prompt),)).fetchone()
+        return row[0] if row else None
+
+    def put(self, model: str, prompt: str, response: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO prompts VALUES (?, ?)", (self._key(model, prompt), response))
+
+    def _index(self, model: str, embed_model: str) -> _VecIndex:
+        index = self._vecs.get((model, embed_model))
+        if index is None:
+            index = self._vecs[(model, embed_model)] = _VecIndex()
+            rows = self._db.execute(
+                "SELECT vec, response FROM embeddings WHERE model = ? AND embed_model = ?", (model, embed_model)
+            )
+            for v, r in rows:
+                index.add(np.frombuffer(v, dtype=np.float64), r)
+        return index
+
+    def get_similar(self, model: str, embed_model: str, vec: np.ndarray) -> Optional[str]:
+        with self._lock:
+            score, response = self._index(model, embed_model).best(vec)
+        return response if score >= self.threshold else None
+
+    def put_similar(self, model: str, embed_model: str, vec: np.ndarray, response: str) -> None:
+        with self._lock, self._db:
+            index = self._index(model, embed_model)  # INSERT 전에 로드해야 새 행이 두 번 들어가지 않음
+            self._db.execute("INSERT INTO embeddings VALUES (?, ?, ?, ?)", (model, embed_model, vec.tobytes(), response))
+            index.add(vec, response)
+
+
+def _unit(vec: List[float]) -> np.ndarray:
+    v = np.asarray(vec, dtype=np.float64)
+    n = np.linalg.norm(v)
+    return v / n if n else v
+
+
 def load_testcases(path: str) -> List[Dict[str, Any]]:
     with open(path, "r", encoding="utf-8") as f:
         obj = json.load(f)
@@ -237,31 +441,101 @@ def main() -> None:
         default=os.environ.get("OLLAMA_HOST", "http://localhost:11434"),
         help="Ollama API host",
     )
+    parser.add_argument(
+        "--keep-alive",
+        default=os.environ.get("OLLAMA_KEEP_ALIVE"),
+        help="Keep the model loaded this long between requests (e.g. 30m); server default if unset",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=int(os.environ.get("OLLAMA_NUM_PARALLEL", "4")),
+        help="Max concurrent generate requests (default: $OLLAMA_NUM_PARALLEL or 4)",
+    )
+    parser.add_argument(
+        "--cache",
+        default="predictions/.prompt_cache.sqlite",
+        help="Prompt→response cache file ('' to disable)",
+    )
+    parser.add_argument(
+        "--semantic-threshold",
+        type=float,
+        default=None,
+        help="Reuse a cached response when question embeddings have cosine similarity >= this (e.g. 0.95); off by default",
+    )
+    parser.add_argument(
+        "--embed-model",
+        default=os.environ.get("OLLAMA_EMBED_MODEL", "nomic-embed-text"),
+        help="Ollama embedding model for --semantic-threshold",
+    )
     args = parser.parse_args()
 
     cases = load_testcases(args.testcases)
+    if args.parallel > 16:
+        _mount_pool(args.parallel)
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
-
-    predictions: List[Dict[str, str]] = []
-    for i, case in enumerate(cases):
+    cache = PromptCache(args.cache, args.semantic_threshold) if args.cache else None
+    semantic = cache is not None and args.semantic_threshold is not None
+
+    # 유사 일치용 임베딩: 캐시에 정확히 없는 질문만 모아 /api/embed 한 번으로 계산
+    vecs: Dict[str, np.ndarray] = {}
+    if semantic:
+        questions = [case.get("question") or case.get("input") or "" for case in cases]
+        todo = list(dict.fromkeys(q for q in questions if cache.get(args.model, build_prompt(q)) is None))
+        if todo:
+            try:
+                vecs = dict(zip(todo, map(_unit, ollama_embed_batch(args.embed_model, todo, host=args.host))))
+            except Exception as e:
+                print(f"[!] Ollama embed failed: {e}", file=sys.stderr)
+
+    def generate(q: str, prompt: str) -> str:
+        if cache is None:
+            return ollama_generate(args.model, prompt, host=args.host, keep_alive=args.keep_alive)
+        hit = cache.get(args.model, prompt)
+        if hit is not None:
+            return hit
+        vec = vecs.get(q)
+        if vec is not None:
+            hit = cache.get_similar(args.model, args.embed_model, vec)
+            if hit is not None:
+                cache.put(args.model, prompt, hit)  # 다음부터는 임베딩 없이 정확 일치로
+                return hit
+        raw = ollama_generate(args.model, prompt, host=args.host, keep_alive=args.keep_alive)
+        cache.put(args.model, prompt, raw)
+        if vec is not None:
+            cache.put_similar(args.model, args.embed_model, vec, raw)
+        return raw
+
+    def run_case(i: int, case: Dict[str, Any]) -> Tuple[str, str]:
         q = case.get("question") or case.get("input") or ""
         cid = case.get("id") or f"q{i+1}"
         prompt = build_prompt(q)
 
         try:
-            raw_sql = ollama_generate(args.model, prompt, host=args.host)
+            raw_sql = generate(q, prompt)
         except Exception as e:
             print(f"[!] Ollama generate failed for {cid}: {e}", file=sys.stderr)
             raw_sql = ""
 
         # 호출부도 question 전달
         # fixed_sql = apply_sql_fixes(raw_sql)  <-- 기존
-        fixed_sql = apply_sql_fixes(raw_sql, question=q)
-        predictions.append({"id": cid, "pred_sql": fixed_sql})
-        print(f"#{i+1:02d} {cid}: {fixed_sql}")
-
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(predictions, f, ensure_ascii=False, indent=2)
+        return cid, apply_sql_fixes(raw_sql, question=q)
+
+    # 요청은 I/O 대기뿐이므로 스레드로 동시에 보내고, 결과는 map 이 입력 순서대로 돌려줌
+    # 예측은 끝나는 대로 임시 파일에 바로 써서 목록을 메모리에 모으지 않고, 마지막에 교체.
+    # (json.dump(..., indent=2) 와 같은 바이트; 중간에 죽어도 기존 output 은 그대로이고,
+    #  다시 돌리면 이미 받은 응답은 --cache 에서 바로 나옴)
+    tmp_path = args.output + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f, \
+            ThreadPoolExecutor(max_workers=max(1, args.parallel)) as pool:
+        sep = "[\n"
+        for i, (cid, fixed_sql) in enumerate(pool.map(run_case, range(len(cases)), cases)):
+            item = json.dumps({"id": cid, "pred_sql": fixed_sql}, ensure_ascii=False, indent=2)
+            f.write(sep + textwrap.indent(item, "  "))
+            sep = ",\n"
+            print(f"#{i+1:02d} {cid}: {fixed_sql}")
+        f.write("[]" if sep == "[\n" else "\n]")
+    os.replace(tmp_path, args.output)
 
     print(f"✅ wrote {args.output}")
 
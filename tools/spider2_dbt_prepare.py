@@ -1,4 +1,5 @@
 import os, json, argparse, re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 def read_text(path):
     try:
@@ -7,24 +8,32 @@ def read_text(path):
     except FileNotFoundError:
         return None
 
+# candidate file names, in priority order
+CANDIDATES_Q = ("question.txt", "query.txt", "nl.txt", "prompt.txt", "task.txt", "readme.md")
+CANDIDATES_SQL = ("gold.sql", "answer.sql", "sql.sql", "target.sql", "gold_query.sql")
+_README_Q_RE = re.compile(r"(?im)^q[:\-]\s*(.+)$")
+
 def extract_from_dir(task_dir):
-    candidates_q = ["question.txt", "query.txt", "nl.txt", "prompt.txt", "task.txt", "readme.md"]
-    candidates_sql = ["gold.sql", "answer.sql", "sql.sql", "target.sql", "gold_query.sql"]
+    # list the dir once and only open candidates that exist (instead of one failed open() per miss)
+    with os.scandir(task_dir) as it:
+        names = {e.name for e in it if e.is_file()}
 
     q = None
-    for c in candidates_q:
+    for c in CANDIDATES_Q:
+        if c not in names: continue
         p = os.path.join(task_dir, c)
         t = read_text(p)
         if t:
             if c.lower() == "readme.md":
-                m = re.search(r"(?im)^q[:\-]\s*(.+)$", t)
+                m = _README_Q_RE.search(t)
                 q = m.group(1).strip() if m else None
             else:
                 q = t
         if q: break
 
     gold = None
-    for c in candidates_sql:
+    for c in CANDIDATES_SQL:
+        if c not in names: continue
         p = os.path.join(task_dir, c)
         t = read_text(p)
         if t: gold = t; break
@@ -38,15 +47,20 @@ def main():
     ap = argparse.ArgumentParser(description="Prepare Spider2-DBT-style tasks (directory layout) into testcases JSON")
     ap.add_argument("--root", required=True, help="Root folder containing many task subdirectories")
     ap.add_argument("--output", default="out/spider2_dbt_testcases.json", help="Output JSON path")
+    ap.add_argument("--processes", type=int, default=0,
+                    help="Use N worker processes instead of threads (for trees with many large README files)")
     args = ap.parse_args()
 
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
-    tasks = []
-    for entry in sorted(os.listdir(args.root)):
-        d = os.path.join(args.root, entry)
-        if os.path.isdir(d):
-            rec = extract_from_dir(d)
-            if rec: tasks.append(rec)
+    dirs = [d for d in (os.path.join(args.root, e) for e in sorted(os.listdir(args.root))) if os.path.isdir(d)]
+    # I/O-bound (several candidate files per task dir): read dirs in parallel; map keeps input order.
+    # --processes moves the README regex work off the GIL at the cost of process start-up
+    if args.processes > 0:
+        with ProcessPoolExecutor(max_workers=args.processes) as ex:
+            tasks = [rec for rec in ex.map(extract_from_dir, dirs, chunksize=64) if rec]
+    else:
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as ex:
+            tasks = [rec for rec in ex.map(extract_from_dir, dirs) if rec]
 
     with open(args.output, "w", encoding="utf-8") as f:
         json.dump(tasks, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,36 @@
+"""Shared record loader for the Spider2 prepare tools (json/jsonl files or folders)."""
+import os, glob
+
+from tsql_eval.jsonio import loads as _loads
+
+try:  # optional: stream very large top-level JSON files instead of loading them whole
+    import ijson
+except ImportError:
+    ijson = None
+
+STREAM_MIN_BYTES = 50 * 1024 * 1024
+
+def iter_json_file(path: str):
+    """Records of a .json file: a top-level list, or the "data" list of a top-level object."""
+    if ijson is not None and os.path.getsize(path) >= STREAM_MIN_BYTES:
+        with open(path, "rb") as f:
+            first = next(ijson.parse(f), (None, None, None))[1]
+            f.seek(0)
+            yield from ijson.items(f, "item" if first == "start_array" else "data.item", use_float=True)
+        return
+    with open(path, "rb") as f:
+        data = _loads(f.read())
+    yield from (data if isinstance(data, list) else data.get("data", []))
+
+def iter_records(path: str):
+    """Yield records from a json/jsonl file or every *.json* file in a folder (lazily, file by file)."""
+    if os.path.isfile(path):
+        if path.endswith(".jsonl"):
+            with open(path, "rb") as f:
+                for line in f:
+                    yield _loads(line)
+        else:
+            yield from iter_json_file(path)
+    else:
+        for p in glob.glob(os.path.join(path, "*.json*")):
+            yield from iter_records(p)
@@ -1,4 +1,8 @@
 import os, json, argparse, glob, csv
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from spider2_io import iter_records
 
 TYPE_MAP_SQLITE = {
     "int": "INTEGER","integer": "INTEGER","bigint": "INTEGER","smallint": "INTEGER",
@@ -6,6 +10,7 @@ TYPE_MAP_SQLITE = {
     "bool": "INTEGER","boolean": "INTEGER","text": "TEXT","string": "TEXT","varchar": "TEXT","char": "TEXT",
     "date": "TEXT","timestamp": "TEXT","datetime": "TEXT",
 }
+@lru_cache(maxsize=None)  # schemas repeat a handful of type strings across thousands of columns
 def norm_type(t: str) -> str:
     if not t: return "TEXT"
     t = t.lower()
@@ -26,51 +31,42 @@ def load_schema_from_json(path: str):
                 tables.append({"name": name, "columns": [(c if isinstance(c,str) else c.get("name"), norm_type(None)) for c in cols]})
     return tables
 
+def _csv_header(p: str):
+    with open(p, "r", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])  # csv.reader only pulls the lines the header spans
+    return os.path.splitext(os.path.basename(p))[0], header
+
 def infer_schema_from_csv_folder(folder: str):
-    tables = []
-    for p in glob.glob(os.path.join(folder, "*.csv")):
-        tname = os.path.splitext(os.path.basename(p))[0]
-        with open(p, "r", encoding="utf-8") as f:
-            reader = csv.reader(f); header = next(reader, [])
-        cols = [(h, "TEXT") for h in header]
-        tables.append({"name": tname, "columns": cols})
-    return tables
+    # header-only reads are I/O-bound: read files in parallel, map keeps glob order
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        return [{"name": tname, "columns": [(h, "TEXT") for h in header]}
+                for tname, header in ex.map(_csv_header, glob.glob(os.path.join(folder, "*.csv")))]
 
 def write_sqlite_ddl(tables, out_sql_path: str):
     os.makedirs(os.path.dirname(out_sql_path), exist_ok=True)
-    lines = []
-    for t in tables:
-        cols = ",\n    ".join([f"{cname} {ctype}" for cname, ctype in t["columns"]])
-        lines.append(f"DROP TABLE IF EXISTS {t['name']};")
-        lines.append(f"CREATE TABLE {t['name']} (\n    {cols}\n);\n")
-    ddl = "\n".join(lines)
+    ddl = "\n".join(
+        f"DROP TABLE IF EXISTS {t['name']};\nCREATE TABLE {t['name']} (\n    "
+        + ",\n    ".join(f"{cname} {ctype}" for cname, ctype in t["columns"])
+        + "\n);\n"
+        for t in tables
+    )
     with open(out_sql_path, "w", encoding="utf-8") as f: f.write(ddl)
     return out_sql_path
 
-def read_tasks_generic(path: str):
-    recs = []
-    if os.path.isfile(path):
-        if path.endswith(".jsonl"):
-            with open(path, "r", encoding="utf-8") as f: recs = [json.loads(line) for line in f]
-        else:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f); recs = data if isinstance(data, list) else data.get("data", [])
-    else:
-        for p in glob.glob(os.path.join(path, "*.json*")): recs.extend(read_tasks_generic(p))
-    return recs
-
 def to_testcases(records, allow_multi_gold: bool = True):
     out = []
+    append = out.append
     for r in records:
-        rid = r.get("id") or r.get("qid") or r.get("task_id") or r.get("question_id")
-        q = r.get("question") or r.get("nl") or r.get("utterance") or r.get("prompt")
-        gold = r.get("gold_sql") or r.get("sql") or r.get("gold")
-        gold_alts = r.get("gold_sql_list") or r.get("sql_variants") or r.get("gold_candidates")
+        get = r.get
+        rid = get("id") or get("qid") or get("task_id") or get("question_id")
+        q = get("question") or get("nl") or get("utterance") or get("prompt")
+        gold = get("gold_sql") or get("sql") or get("gold")
+        gold_alts = get("gold_sql_list") or get("sql_variants") or get("gold_candidates")
         if allow_multi_gold and isinstance(gold_alts, list) and gold_alts:
             gold_sql = gold_alts
         else:
             gold_sql = [gold] if isinstance(gold, str) else gold
-        if rid and q and gold_sql: out.append({"id": str(rid), "question": q, "gold_sql": gold_sql})
+        if rid and q and gold_sql: append({"id": str(rid), "question": q, "gold_sql": gold_sql})
     return out
 
 def main():
@@ -93,7 +89,7 @@ def main():
     else:
         print("[i] No schema provided/inferred; skipping DDL.")
 
-    recs = read_tasks_generic(args.tasks)
+    recs = iter_records(args.tasks)
     tcs = to_testcases(recs, allow_multi_gold=True)
     os.makedirs(os.path.dirname(args.testcases_out), exist_ok=True)
     with open(args.testcases_out, "w", encoding="utf-8") as f: json.dump(tcs, f, ensure_ascii=False, indent=2)